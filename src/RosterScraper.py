@@ -2,32 +2,99 @@ import PySimpleGUI as sg
 from pathlib import Path
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+import urllib3
+from bs4 import BeautifulSoup, SoupStrainer
 import re
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qs, parse_qsl, urlencode, quote
+from html.parser import HTMLParser
+import codecs
+import argparse
+import json
+import csv
+import io
+import gzip
+import sys
+import time
 import validators
+import soupsieve
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+import multiprocessing
+import queue
+import threading
+import hashlib
+import base64
+import uuid
+import bisect
+import struct
+import datetime
+import sqlite3
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# This hashmap matches the netloc (example.com) of a WMT website team url to two tuples:
-# the first represents the BeautifulSoup find parameter for its athlete roster
-# and the second represents the the BeautifulSoup find_all parameter for every athlete within the roster
-team_hashmap = {
-    "arkansasrazorbacks.com": [("table"), ("tr")],
-    "vucommodores.com": [("table"), ("tr")],
-    "clemsontigers.com": [("ul", {"id": "person__table"}), ("li", {"class": "person__item"})],
-    "und.com": [("div", {"class": "featured__list"}), ("div", {"class": "player col-lg-3 col-sm-6 col-xs-12"})],
-    "ohiostatebuckeyes.com": [("div", {"class": "roster-photo"}), ("div", {"class": "ohio-square-blocks__item col-lg-3 col-md-3 col-sm-4 col-xs-12"})],
-    "ramblinwreck.com": [("section", {"class": "roster__list"}), ("div", {"class": "roster__list_item"})],
-    "seminoles.com": [("div", {"id": "roster"}), ("div", {"class": "thumbnail"})],
-    "hawkeyesports.com": [("div", {"id": "players"}), ("div", {"itemprop": "athlete"})],
-    "kuathletics.com": [("div", {"id": "players"}), ("div", {"itemprop": "athlete"})],
-    "virginiasports.com": [("div", {"id": "players"}), ("div", {"itemprop": "athlete"})],
-    "miamihurricanes.com": [("div", {"id": "players"}), ("div", {"itemprop": "athlete"})],
-    "golobos.com": [("div", {"id": "players"}), ("div", {"itemprop": "athlete"})],
-    "lsusports.net": [("div", {"id": "players"}), ("div", {"itemprop": "athlete"})],
-    "ukathletics.com": [("div", {"class": "roster__flex-wrapper"}), ("div", {"itemprop": "athlete"})],
-    "gamecocksonline.com": [("div", {"class": "container roster__wrapper"}), ("li", {"itemprop": "athlete"})]
+# Site definitions of the WMT websites, read from sites.json next to this file (or inside the app bundle).
+# Each definition matches the netloc (example.com) of a WMT website team url to its roster page:
+# "roster" is the BeautifulSoup find parameter for its athlete roster, "athlete" the find_all parameter
+# for every athlete within the roster and "fields" says where each athlete's name, image and other
+# columns are found (see FieldExtractor). Each definition is compiled into a SiteAdapter,
+# so adding or fixing a site is an edit to the definitions file only
+SITES_PATH = Path(getattr(sys, "_MEIPASS", Path(__file__).parent)) / "sites.json"
 
-}
+# Definitions last loaded from the site definitions file, keyed by netloc
+team_hashmap = {}
+
+
+# Raised when a roster cannot be scraped, its message is what gets shown to the user
+class RosterScraperError(Exception):
+    pass
+
+
+# Browser user agent sent with every request, some athletics sites reject the default python-requests one
+HEADERS = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/105.0.0.0 Safari/537.36"}
+
+# Shared session so roster and bio page requests to the same site reuse one connection,
+# with a connection pool big enough for the fetchers of a batch run
+session = requests.Session()
+session.headers.update(HEADERS)
+session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32))
+session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+# Platforms a roster page can be fingerprinted as
+SIDEARM_STATIC = "sidearm"
+SIDEARM_DYNAMIC = "sidearm-dynamic"
+WMT = "wmt"
+MICRODATA = "microdata"
+UNKNOWN = "unknown"
+
+# Number of bytes from the start of the body that fingerprint_platform looks at
+FINGERPRINT_BYTES = 32768
+
+# Roster columns, in the order they are written to the CSV. Image URL is the rendition asked for by the
+# image size policy, Original Image URL the full size image. The last ones are the typed MEASUREMENT_COLUMNS
+COLUMNS = ['First Name', 'Last Name', 'Email', 'Image URL', 'Hometown City', 'Hometown State',
+           'Class', 'High School', 'Position', 'Jersey Number', 'Height', 'Weight', 'Original Image URL',
+           'Height (in)', 'Weight (lbs)', 'Class Year', 'Redshirt']
+
+# Columns parsed by add_measurement_columns from Height, Weight and Class, with their pandas dtypes
+MEASUREMENT_COLUMNS = {'Height (in)': "Float64", 'Weight (lbs)': "Float64", 'Class Year': "Int64", 'Redshirt': "boolean"}
+
+# Column added after COLUMNS by the image stage, with the local path of each athlete's downloaded photo
+IMAGE_PATH_COLUMN = 'Image Path'
+
+# Roster pages fingerprinted as unsupported, mapped to when, so scraping one again within UNSUPPORTED_PAGE_TTL
+# seconds fails without a request. A fingerprint describes one page, so other pages of the site are still fetched
+unsupported_pages = {}
+UNSUPPORTED_PAGE_TTL = 600
+
+# Sidearm roster lists, and the elements that mark the end of the roster section on a Sidearm page
+SIDEARM_ROSTER_CONTAINER = ("ul", {"class": "sidearm-roster-players"})
+SIDEARM_ROSTER_END = [("ul", {"class": "sidearm-roster-coaches"}), ("footer",)]
+
+# After a streamed roster page is cut short, at most this many trailing bytes are drained
+# so the connection can go back to the session pool instead of being closed
+STREAM_DRAIN_BYTES = 65536
+
+# Tags without a closing tag, which the streaming parser does not track
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
 
 
 # Returns true if the url is absolute (begins with example.com) or not, used for joining netlocs with images that do not have absolute URL
@@ -43,243 +110,2748 @@ def html_to_text(elem):
     else:
         return ''
 
-# Converts team roster data for non-dynamically generated Sidearm and WMT websites into a Pandas DataFrame
-def convert_url_to_df(url):
-    #Initialize empty data object
-    data = {'First Name': [],
-            'Last Name': [],
-            'Email': [],
-            'Image URL': [],
-            'Hometown City': [],
-            'Hometown State': [],
-            'Class': [],
-            'High School': [],
-            'Position': [],
-            'Jersey Number': [],
-            'Height': [],
-            'Weight': []
-            }
-
-    #Checks HTTP status code of user inputted URL, exits program if status code is not successful (200-299)
-    r = requests.get(url, headers={
-                     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/105.0.0.0 Safari/537.36"})
-    if (r.status_code // 100 != 2):
-        sg.popup_error(str(r.status_code) + " HTTP error: Please try a different URL", title="")
-        return 
-    #Parses url text into soup
-    soup = BeautifulSoup(r.text, "html.parser")
+# Reads from a streamed response until at least size bytes of the body have arrived,
+# returns the bytes read and the iterator over the rest of the body
+def read_head(r, size=FINGERPRINT_BYTES):
+    chunks = r.iter_content(chunk_size=8192)
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= size:
+            break
+    return head, chunks
 
-    #For these two WMT websites, we have to find the image separately on each athlete's bio since images do not appear on the main roster
-    if (urlparse(url).netloc == "arkansasrazorbacks.com") or (urlparse(url).netloc == "vucommodores.com"):
 
-        roster = soup.find(team_hashmap[urlparse(url).netloc][0])
-        #Creates list of athletes
-        athletes = roster.find_all(team_hashmap[urlparse(url).netloc][1])
+# Finds athlete microdata or a JSON-LD athlete list in the start of a page
+MICRODATA_RE = re.compile(rb'itemprop=["\']athlete["\']|application/ld\+json[^>]*>[^<]*"athlete"')
 
-        if not athletes:
-            sg.popup_error("Please double check your URL", title="")
+
+# Identifies the platform of a roster page from its response headers and the first few KB of its body.
+# Sites in team_hashmap are known by their adapter, Sidearm pages mention sidearm in their <head>
+# and the dynamically generated ones load their roster through Nuxt. Any other page marking athletes
+# up with schema.org microdata or JSON-LD early enough is handled by the microdata extractor
+def fingerprint_platform(netloc, headers, head):
+    adapter = find_site_adapter(netloc)
+    if adapter:
+        return adapter.platform
+    head = head.lower()
+    if b"sidearm" in head or "sidearm" in headers.get("Set-Cookie", "").lower():
+        if b"/_nuxt/" in head or b"__nuxt" in head:
+            return SIDEARM_DYNAMIC
+        return SIDEARM_STATIC
+    if MICRODATA_RE.search(head):
+        return MICRODATA
+    return UNKNOWN
+
+
+# Returns true if a start tag matches a (tag, attrs) BeautifulSoup find parameter,
+# class values match either the full class attribute or any one class in it like BeautifulSoup does
+def tag_matches(spec, tag, attrs):
+    if isinstance(spec, str):
+        spec = (spec,)
+    if spec[0] != tag:
+        return False
+    attrs = dict(attrs)
+    for key, value in (spec[1] if len(spec) > 1 else {}).items():
+        actual = attrs.get(key)
+        if actual is None:
+            return False
+        if actual != value and not (key == "class" and value in actual.split()):
+            return False
+    return True
+
+
+# Incremental HTML parser fed with the chunks of a streamed roster page. It tracks how deep it is in the page
+# and sets done once every roster container has closed: immediately after the first container closes,
+# or when end_markers are given (pages with several roster lists), once one of them starts after a container has closed
+class RosterStreamParser(HTMLParser):
+    def __init__(self, container, end_markers=None):
+        super().__init__(convert_charrefs=False)
+        self.container = container
+        self.end_markers = end_markers
+        self.stack = []
+        self.container_depth = None
+        self.containers_closed = 0
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
             return
+        if self.containers_closed and self.end_markers:
+            if any(tag_matches(marker, tag, attrs) for marker in self.end_markers):
+                self.done = True
+                return
+        if tag in VOID_TAGS:
+            return
+        self.stack.append(tag)
+        if self.container_depth is None and tag_matches(self.container, tag, attrs):
+            self.container_depth = len(self.stack) - 1
+
+    def handle_endtag(self, tag):
+        if self.done or tag not in self.stack:
+            return
+        #Pops any unclosed tags (<li>, <p>) along with the closed one
+        while self.stack.pop() != tag:
+            pass
+        if self.container_depth is not None and len(self.stack) <= self.container_depth:
+            self.container_depth = None
+            self.containers_closed += 1
+            if not self.end_markers:
+                self.done = True
 
-        #Iterates through list of athletes
-        for athlete in athletes:
-            info = athlete.find("a", href=True)
-            if info is not None:
-                name = html_to_text(info)
 
-                first_name = name.split(" ", 1)[0]
-                data["First Name"].append(first_name)
+# Stops reading a streamed response early. If only a little of the body is left it is drained
+# so the connection is returned to the session pool, otherwise the connection is closed
+def release_response(r):
+    if len(r.raw.read(STREAM_DRAIN_BYTES, decode_content=False)) < STREAM_DRAIN_BYTES:
+        r.raw.release_conn()
+    else:
+        r.close()
 
-                last_name = name.split(" ", 1)[1]
-                data["Last Name"].append(last_name)
 
-                email = str(first_name.replace(" ", "") + "+" +
-                                  last_name.replace(" ", "") + "@example.com")
-                data['Email'].append(email)
+# Reads the rest of a streamed roster page, feeding each chunk into a RosterStreamParser
+# and stopping as soon as the roster container has closed. Returns the decoded text read so far
+def stream_roster_text(r, head, rest, container, end_markers=None):
+    decoder = codecs.getincrementaldecoder(r.encoding or "utf-8")(errors="replace")
+    parser = RosterStreamParser(container, end_markers)
+    text = [decoder.decode(head)]
+    parser.feed(text[0])
+    for chunk in rest:
+        if parser.done:
+            break
+        text.append(decoder.decode(chunk))
+        parser.feed(text[-1])
+    if parser.done:
+        release_response(r)
+    else:
+        text.append(decoder.decode(b"", final=True))
+    return "".join(text)
 
-                athlete_url = info['href']
-                if not is_absolute(athlete_url):
-                    athlete_url = "https://" + \
-                        urlparse(url).netloc + athlete_url
 
-                r = requests.get(athlete_url, headers={
-                                 "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/105.0.0.0 Safari/537.36"})
+# Finds an image url nested inside another url, as on ukathletics.com and gamecocksonline.com
+NESTED_URL_RE = re.compile(r'.(https?://.*)')
 
-                soup = BeautifulSoup(r.text, "html.parser")
-                person = soup.find('section', {'class': re.compile(r'bio')})
-                image_url = person.find('img')['src']
+# Fix-ups a site definition can apply to the image urls of its athletes
+URL_FIXES = {"nested_url": NESTED_URL_RE}
 
-                #Removes dimmension parameters from image url
-                image_url = re.sub('-\d+[Xx]\d+', '', image_url)
+# Jersey numbers and other characters that are not part of a name in Sidearm name sections
+JERSEY_IN_NAME_RE = re.compile(r'[^a-zA-Z .-]+')
 
-                if not is_absolute(image_url):
-                    image_url = "https://www." + \
-                        urlparse(url).netloc + image_url
+# Dimension parameters in image urls, removed to get the full size image
+SIZE_RE = re.compile(r'-\d+[Xx]\d+')
 
-                data['Image URL'].append(image_url)
+# Matches the <script> blocks of a page, the JSON roster data of dynamically generated Sidearm pages lives in one of them
+SCRIPT_RE = re.compile(r'<script\b([^>]*)>(.*?)</script>', re.S | re.I)
 
+# Keys of a JSON athlete object, in order of preference, for each roster column
+SIDEARM_JSON_FIELDS = {
+    'First Name': ("firstName", "first_name"),
+    'Last Name': ("lastName", "last_name"),
+    'Hometown': ("hometown",),
+    'Class': ("academicYearShort", "academicYearLong", "academicYear", "academic_year"),
+    'High School': ("highSchool", "highschool", "high_school"),
+    'Position': ("positionShort", "positionLong", "position"),
+    'Jersey Number': ("jerseyNumber", "jersey", "jersey_number"),
+    'Weight': ("weight",),
+}
+
+# An object is taken as a player (not a coach or staff member) if it has a name and one of these keys
+SIDEARM_JSON_PLAYER_KEYS = {"jerseyNumber", "jersey", "positionShort", "position", "academicYearShort", "academicYear"}
+
+
+# Rebuilds the object graph of a Nuxt __NUXT_DATA__ payload, which is serialized as one flat
+# array where objects and arrays refer to their members by index
+def unflatten_nuxt_data(values):
+    hydrated = {}
+
+    def hydrate(index):
+        if not isinstance(index, int) or not 0 <= index < len(values):
+            return None
+        if index in hydrated:
+            return hydrated[index]
+        value = values[index]
+        if isinstance(value, dict):
+            hydrated[index] = result = {}
+            for key, member in value.items():
+                result[key] = hydrate(member)
+        elif isinstance(value, list) and value and isinstance(value[0], str):
+            #Typed values such as ["Reactive", 1] or ["Set", 2, 3]
+            if value[0] in ("Reactive", "ShallowReactive", "Ref", "ShallowRef"):
+                result = hydrate(value[1])
+            elif value[0] in ("Set", "Map"):
+                result = [hydrate(member) for member in value[1:]]
             else:
-                data["First Name"].append("")
-                data["Last Name"].append("")
-                data["Email"].append("")
-                data["Image URL"].append("")
-
-            data['Hometown City'].append("")
-            data['Hometown State'].append("")
-            data['Class'].append("")
-            data['High School'].append("")
-            data['Position'].append("")
-            data['Jersey Number'].append("")
-            data['Height'].append("")
-            data['Weight'].append("")
-            
-
-    # All of other WMT websites in the hashmap, which do have the athlete images on the main roster
-    elif (urlparse(url).netloc in team_hashmap):
-
-        roster = soup.find(*team_hashmap[urlparse(url).netloc][0])
-        #Creates list of athletes
-        athletes = roster.find_all(*team_hashmap[urlparse(url).netloc][1])
+                result = None
+            hydrated[index] = result
+        elif isinstance(value, list):
+            hydrated[index] = result = []
+            result.extend(hydrate(member) for member in value)
+        else:
+            result = value
+        return result
+
+    return hydrate(0)
 
-        if not athletes:
-            sg.popup_error("Please double check your URL", title="")
-            return
 
-        #Iterates through athletes list
-        for athlete in athletes:
-            if (urlparse(url).netloc == "lsusports.net") or (urlparse(url).netloc == "ukathletics.com") or (urlparse(url).netloc == "gamecocksonline.com"):
-                name = athlete.find("span", {"itemprop": "name"})["content"]
-                image_url = athlete.find(
-                    "span", {"itemprop": "image"})["content"]
-                # These two websites have the images loaded in a strange format with two https:// links
-                # applying urlparse(image_url).path[1:] fixes it
-                if (urlparse(url).netloc == "ukathletics.com") or (urlparse(url).netloc == "gamecocksonline.com"):
-                    image_url = urlparse(image_url).path[1:]
+# Returns every JSON object embedded in the <script> blocks of a page
+def find_embedded_json(text):
+    found = []
+    for attrs, body in SCRIPT_RE.findall(text):
+        if "json" not in attrs.lower() or not body.strip():
+            continue
+        try:
+            value = json.loads(body)
+        except ValueError:
+            continue
+        if "__NUXT_DATA__" in attrs and isinstance(value, list):
+            value = unflatten_nuxt_data(value)
+        found.append(value)
+    return found
 
+
+# Walks a decoded JSON value and returns the lists of player objects in it
+def find_json_players(value):
+    players = []
+    pending = [value]
+    seen = set()
+    while pending:
+        value = pending.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        if isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, list):
+            if value and all(isinstance(item, dict) and ("firstName" in item or "first_name" in item)
+                             and SIDEARM_JSON_PLAYER_KEYS.intersection(item) for item in value):
+                players.append(value)
             else:
-                name = athlete.find("img")['alt']
-                name = " ".join(name.split())
-                image_url = athlete.find("img")['src']
-                if not is_absolute(image_url):
-                    image_url = urlparse(url).netloc + image_url
-                
-            first_name = name.split(" ", 1)[0]
-            data["First Name"].append(first_name)
-
-            last_name = name.split(" ", 1)[1]
-            data["Last Name"].append(last_name)
-
-            email = str(first_name.replace(" ", "") + "+" +
-                              last_name.replace(" ", "") + "@example.com")
-            data['Email'].append(email)
-
-            image_url = re.sub('-\d+[Xx]\d+', '', image_url)
-            data['Image URL'].append(image_url)
-
-            data['Hometown City'].append("")
-            data['Hometown State'].append("")
-            data['Class'].append("")
-            data['High School'].append("")
-            data['Position'].append("")
-            data['Jersey Number'].append("")
-            data['Height'].append("")
-            data['Weight'].append("")
-
-
-    elif re.search("sidearm", r.text):
-        teams = soup.find_all("ul", {"class": "sidearm-roster-players"})
-        roster = []
-        if teams:
-            for team in teams:
-                athletes = team.find_all(
-                    "li", {"class": "sidearm-roster-player"})
-                roster.extend(athletes)
-
-            if not athletes:
-                sg.popup_error("Please double check your URL", title="")
+                pending.extend(value)
+    return players
+
+
+# Returns a scalar JSON value as text
+def json_to_text(value):
+    if value is None or isinstance(value, (dict, list)):
+        return ''
+    return ' '.join(str(value).split())
+
+
+# Extracts athletes from the JSON roster data of a dynamically generated Sidearm page without parsing its html,
+# returns a list of dictionaries keyed by roster column, with their raw Hometown for normalize_athletes
+def extract_sidearm_json(text, netloc):
+    athletes = []
+    seen = set()
+    for value in find_embedded_json(text):
+        for players in find_json_players(value):
+            for player in players:
+                row = {}
+                for column, keys in SIDEARM_JSON_FIELDS.items():
+                    row[column] = next((json_to_text(player[key]) for key in keys if player.get(key) is not None), '')
+
+                if (row['First Name'], row['Last Name'], row['Jersey Number']) in seen:
+                    continue
+                seen.add((row['First Name'], row['Last Name'], row['Jersey Number']))
+
+                if player.get("heightFeet") is not None:
+                    row['Height'] = json_to_text(player["heightFeet"]) + "-" + json_to_text(player.get("heightInches") or 0)
+                else:
+                    row['Height'] = json_to_text(player.get("height"))
+
+                image = player.get("image") or {}
+                image_url = image.get("url") or image.get("absoluteUrl") if isinstance(image, dict) else image
+                row['Image URL'] = image_url if isinstance(image_url, str) else ''
+
+                athletes.append(row)
+    return athletes
+
+
+# Raw fields extractors can give instead of the columns normalize_athletes derives from them:
+# a full name for First Name and Last Name, and a "City, State" hometown for Hometown City and Hometown State
+NAME = "Name"
+HOMETOWN = "Hometown"
+
+# Patterns of the column normalization. They are kept as strings, which pandas hands to the string kernels
+# of pyarrow backed columns, where compiled patterns are matched in Python one value at a time.
+# Whitespace is every character str.split splits on, which the kernels' \s doesn't cover (non-breaking spaces).
+# Names and hometowns are split at their first space and comma by removing what is before or after it
+WHITESPACE_PATTERN = "[\\s\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+"
+FIRST_WORD_PATTERN = r'^[^ ]* ?'
+AFTER_FIRST_WORD_PATTERN = r' .*$'
+CITY_PATTERN = r'^[^,]*,?'
+AFTER_CITY_PATTERN = r'(?s),.*$'
+QUERY_PATTERN = r'(?s)\?.*$'
+ABSOLUTE_URL_PATTERN = r'^(?:[a-zA-Z][a-zA-Z0-9+.-]*:)?//'
+
+
+# Builds a roster row for an athlete known only by name and image, the way WMT sites list them
+def athlete_row(name, image_url):
+    row = dict.fromkeys(COLUMNS, "")
+    row[NAME] = name
+    row['Image URL'] = image_url
+    return row
+
+
+# Cleans up an athlete image url: nested_re pulls a real image url out of the url it is nested in
+# and relative urls get the site netloc (after prefix). Dimension suffixes are removed by normalize_athletes
+def clean_image_url(image_url, netloc, nested_re=None, prefix=""):
+    nested = nested_re.search(image_url) if nested_re else None
+    if nested:
+        image_url = nested.group(1)
+    if not is_absolute(image_url):
+        image_url = prefix + netloc + image_url
+    return image_url
+
+
+# Compiles a (tag, attrs) BeautifulSoup find parameter into a SoupStrainer, so only the matching elements are parsed.
+# Class values are compiled to regexes so they still match elements carrying other classes too
+def compile_selector(spec):
+    attrs = {}
+    for key, value in (spec[1] if len(spec) > 1 else {}).items():
+        attrs[key] = re.compile(r'(^|\s)' + re.escape(value) + r'(\s|$)') if key == "class" else value
+    return SoupStrainer(spec[0], attrs)
+
+
+# Bio pages of a roster fetched at once
+BIO_PAGE_FETCHERS = 8
+
+# Field defaults of a site definition: an athlete's name and image are the alt text and src of their image
+DEFAULT_FIELDS = {"name": {"css": "img", "attr": "alt"}, "image": {"css": "img", "attr": "src"}}
+
+
+# A field of a site definition, compiled once. "css" selects the element holding the value within the athlete,
+# "attr" is the attribute holding it ("text" for the element's text). With "follow", the value is found on the page
+# linked by the selected element instead (an athlete's bio page), of which only the "page" find parameter is parsed.
+# Bio pages are taken from pages (urls mapped to text, see SiteAdapter.linked_pages) when there, or else fetched.
+# Image urls go through the named "fixes" of URL_FIXES, and relative ones get "relative_prefix" and the site netloc
+class FieldExtractor:
+    def __init__(self, css=None, attr="text", follow=None, page=None, fixes=(), relative_prefix=""):
+        self.css = soupsieve.compile(css) if css else None
+        self.attr = attr
+        self.follow = soupsieve.compile(follow) if follow else None
+        self.page_strainer = compile_selector(page) if page else None
+        self.fixes = [URL_FIXES[fix] for fix in fixes]
+        self.relative_prefix = relative_prefix
+
+    #Returns the url of the page an athlete's value is found on, None for fields read from the athlete itself
+    def page_url(self, athlete, netloc):
+        link = self.follow.select_one(athlete) if self.follow else None
+        if link is None or not link.get("href"):
+            return None
+        page_url = link["href"]
+        return page_url if is_absolute(page_url) else "https://" + netloc + page_url
+
+    def extract(self, athlete, netloc, pages=None):
+        element = athlete
+        if self.follow:
+            page_url = self.page_url(athlete, netloc)
+            if page_url is None:
+                return None
+            text = pages[page_url] if pages and page_url in pages else get_page(page_url).text
+            element = BeautifulSoup(text, "html.parser", parse_only=self.page_strainer)
+        if self.css:
+            element = self.css.select_one(element)
+        if element is None:
+            return None
+        return html_to_text(element) if self.attr == "text" else element.get(self.attr)
+
+
+# Roster page of a site in team_hashmap, compiled once from its definition. "image_size" replaces the
+# platform's image size policy for the site (see IMAGE_SIZE_POLICIES)
+class SiteAdapter:
+    def __init__(self, netloc, roster, athlete, fields=None, image_size=None):
+        self.netloc = netloc
+        self.image_size = image_size
+        self.roster = tuple(roster)
+        self.athlete = tuple(athlete)
+        self.roster_strainer = compile_selector(roster)
+        self.athlete_strainer = compile_selector(athlete)
+        fields = {**DEFAULT_FIELDS, **(fields or {})}
+        #Sites marking athletes with itemprop="athlete" are read by the microdata extractor, which only finds
+        #names and images, so sites defining column fields are read through their fields instead
+        microdata = self.athlete[1:] and self.athlete[1].get("itemprop") == "athlete"
+        self.platform = MICRODATA if microdata and not set(fields) & set(COLUMNS) else WMT
+        unknown = set(fields) - {"name", "image"} - set(COLUMNS)
+        if unknown:
+            raise ValueError(netloc + " defines unknown fields: " + ", ".join(sorted(unknown)))
+        self.fields = {column: FieldExtractor(**field) for column, field in fields.items()}
+
+    def clean_image_url(self, image_url):
+        image = self.fields["image"]
+        for fix in image.fixes:
+            nested = fix.search(image_url)
+            if nested:
+                image_url = nested.group(1)
+        return clean_image_url(image_url, self.netloc, prefix=image.relative_prefix)
+
+    #Returns the athlete elements of the text of the site's roster page, only the roster container is parsed into soup
+    def athletes(self, text):
+        roster = BeautifulSoup(text, "html.parser", parse_only=self.roster_strainer).find(self.roster_strainer)
+        return roster.find_all(self.athlete_strainer) if roster is not None else []
+
+    #Fetches the bio pages the site's fields follow from the athletes of its roster page, workers at a time,
+    #and returns their urls mapped to their text. Called by the fetch stage of batches, so parser processes
+    #only ever parse. Sites without followed fields have none
+    def linked_pages(self, text, workers=BIO_PAGE_FETCHERS):
+        followed = [field for field in self.fields.values() if field.follow]
+        if not followed:
+            return {}
+        urls = list(dict.fromkeys(url for athlete in self.athletes(text) for field in followed
+                                  for url in [field.page_url(athlete, self.netloc)] if url))
+        with ThreadPoolExecutor(workers) as pool:
+            return dict(zip(urls, pool.map(lambda url: get_page(url).text, urls)))
+
+    #Extracts the athletes from the text of the site's roster page, reading followed fields from pages
+    def extract(self, text, pages=None):
+        athletes = []
+        #Iterates through athletes list, skipping rows without a name (table headers)
+        for athlete in self.athletes(text):
+            name = self.fields["name"].extract(athlete, self.netloc, pages)
+            if not name:
+                continue
+            image_url = self.fields["image"].extract(athlete, self.netloc, pages)
+            row = athlete_row(name, self.clean_image_url(image_url) if image_url else "")
+            for column, field in self.fields.items():
+                if column in COLUMNS:
+                    row[column] = ' '.join((field.extract(athlete, self.netloc, pages) or '').split())
+            athletes.append(row)
+        return athletes
+
+
+# Adapters of the sites in team_hashmap, keyed by netloc
+site_adapters = {}
+
+# Path and modification time of the site definitions file last loaded
+sites_loaded = None
+
+# Counts the site definitions loads, so a parsing pool started before a reload can be told apart
+sites_generation = 0
+
+
+# Reads a site definitions file, YAML files need PyYAML
+def read_site_definitions(path):
+    path = Path(path)
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise RosterScraperError("PyYAML is needed to read site definitions from " + path.name)
+        return yaml.safe_load(path.read_text())
+    return json.loads(path.read_text())
+
+
+# Loads a site definitions file and compiles an adapter for every site in it, replacing the ones in use
+def load_site_definitions(path=SITES_PATH):
+    global team_hashmap, site_adapters, sites_loaded, sites_generation
+    path = Path(path)
+    mtime = path.stat().st_mtime_ns
+    definitions = {netloc.lower(): definition for netloc, definition in read_site_definitions(path).items()}
+    adapters = {netloc: SiteAdapter(netloc, **definition) for netloc, definition in definitions.items()}
+    team_hashmap, site_adapters, sites_loaded = definitions, adapters, (path, mtime)
+    sites_generation += 1
+    unsupported_pages.clear()
+
+
+# Reloads the site definitions if their file changed since it was loaded, so a long running server picks up
+# edited definitions without a restart. A file that fails to load leaves the previous definitions in use
+def reload_site_definitions():
+    global sites_loaded
+    path, mtime = sites_loaded
+    try:
+        if path.stat().st_mtime_ns == mtime:
+            return False
+        load_site_definitions(path)
+        return True
+    except Exception as error:
+        print(f"Keeping the previous site definitions, {path} could not be loaded: {error}", file=sys.stderr)
+        sites_loaded = (path, path.stat().st_mtime_ns) if path.exists() else sites_loaded
+        return False
+
+
+# Sidearm roster lists, the only part of a static Sidearm page parsed into soup
+SIDEARM_STRAINER = compile_selector(SIDEARM_ROSTER_CONTAINER)
+
+load_site_definitions()
+
+
+# Returns the adapter of the site a netloc belongs to. The netloc and then each of its parent domains
+# is looked up, so www. and other subdomains of a site in team_hashmap find its adapter
+def find_site_adapter(netloc):
+    netloc = netloc.lower().split(":")[0]
+    while netloc not in site_adapters:
+        if "." not in netloc:
+            return None
+        netloc = netloc.split(".", 1)[1]
+    return site_adapters[netloc]
+
+
+# Single pass parser pulling schema.org athlete entities out of a page, both from itemprop="athlete"
+# microdata and from JSON-LD athlete lists. Athletes without an itemprop name or image fall back
+# to the alt text and src of their first <img>. Sets done once the page footer starts after athletes were found
+class MicrodataParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.stack = []
+        self.athletes = []
+        self.linked_athletes = []
+        self.athlete = None
+        self.athlete_depth = None
+        self.name_depth = None
+        self.name_text = []
+        self.json_ld = None
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "footer" and (self.athletes or self.linked_athletes) and self.athlete is None and not {"main", "article", "section"}.intersection(self.stack):
+            self.done = True
+            return
+        attrs = dict(attrs)
+        if tag == "script" and attrs.get("type") == "application/ld+json":
+            self.json_ld = []
+        if tag not in VOID_TAGS:
+            self.stack.append(tag)
+        itemprop = (attrs.get("itemprop") or "").split()
+
+        if "athlete" in itemprop and self.athlete is None and tag not in VOID_TAGS:
+            self.athlete = {}
+            self.athlete_depth = len(self.stack) - 1
+        elif self.athlete is not None:
+            if "name" in itemprop and "name" not in self.athlete:
+                if attrs.get("content") is not None:
+                    self.athlete["name"] = attrs["content"]
+                elif tag not in VOID_TAGS:
+                    self.name_depth = len(self.stack) - 1
+                    self.name_text = []
+            if "image" in itemprop and "image" not in self.athlete:
+                image_url = attrs.get("content") or attrs.get("src") or attrs.get("href")
+                if image_url:
+                    self.athlete["image"] = image_url
+            if tag == "img" and "img" not in self.athlete:
+                self.athlete["img"] = (attrs.get("alt") or "", attrs.get("src") or attrs.get("data-src") or "")
+
+    def handle_data(self, data):
+        if self.json_ld is not None:
+            self.json_ld.append(data)
+        elif self.name_depth is not None:
+            self.name_text.append(data)
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+        if tag == "script" and self.json_ld is not None:
+            self.add_json_ld("".join(self.json_ld))
+            self.json_ld = None
+        if tag not in self.stack:
+            return
+        while self.stack.pop() != tag:
+            pass
+        if self.name_depth is not None and len(self.stack) <= self.name_depth:
+            self.athlete["name"] = "".join(self.name_text)
+            self.name_depth = None
+        if self.athlete is not None and len(self.stack) <= self.athlete_depth:
+            alt, src = self.athlete.get("img", ("", ""))
+            if self.athlete.get("name") or alt:
+                self.athletes.append((self.athlete.get("name") or alt, self.athlete.get("image") or src))
+            self.athlete = None
+            self.name_depth = None
+
+    #Collects the people listed under "athlete" anywhere in a JSON-LD block
+    def add_json_ld(self, text):
+        try:
+            pending = [json.loads(text)]
+        except ValueError:
+            return
+        while pending:
+            value = pending.pop()
+            if isinstance(value, list):
+                pending.extend(reversed(value))
+            elif isinstance(value, dict):
+                athletes = value.get("athlete")
+                for person in athletes if isinstance(athletes, list) else [athletes]:
+                    if not isinstance(person, dict):
+                        continue
+                    name = person.get("name") or " ".join(filter(None, [person.get("givenName"), person.get("familyName")]))
+                    image = person.get("image")
+                    if isinstance(image, dict):
+                        image = image.get("url") or image.get("contentUrl")
+                    if name:
+                        self.linked_athletes.append((name, image if isinstance(image, str) else ""))
+                pending.extend(reversed([member for key, member in value.items() if key != "athlete"]))
+
+
+# Converts the (name, image url) pairs found by a MicrodataParser into roster rows, image urls are cleaned up
+# by the site's adapter when it has one and otherwise with the nested url fix-up. A JSON-LD athlete is dropped
+# when a microdata item of the same name is left to pair it with, athletes sharing a name within one source are kept
+def microdata_rows(parser, netloc, adapter=None):
+    rows = []
+    athletes = list(parser.athletes)
+    unpaired = {}
+    for name, _ in athletes:
+        unpaired[name] = unpaired.get(name, 0) + 1
+    for name, image_url in parser.linked_athletes:
+        if unpaired.get(name):
+            unpaired[name] -= 1
+        else:
+            athletes.append((name, image_url))
+    for name, image_url in athletes:
+        if image_url:
+            image_url = adapter.clean_image_url(image_url) if adapter else clean_image_url(image_url, netloc, NESTED_URL_RE)
+        rows.append(athlete_row(name, image_url))
+    return rows
+
+
+# Extracts the athletes of a microdata page in a single MicrodataParser pass over its text, no soup is built
+def extract_microdata(text, netloc, adapter=None):
+    parser = MicrodataParser()
+    parser.feed(text)
+    parser.close()
+    return microdata_rows(parser, netloc, adapter)
+
+
+# Times the microdata extractor against the BeautifulSoup extraction on a saved roster page of a team_hashmap site
+def benchmark_microdata(html_file, netloc, repeat=20):
+    text = Path(html_file).read_text(errors="replace")
+    adapter = find_site_adapter(netloc)
+    timings = {}
+    for label, extract in (("soup", lambda: adapter.extract(text)),
+                           ("microdata", lambda: extract_microdata(text, netloc, adapter))):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            athletes = extract()
+        timings[label] = (time.perf_counter() - start) / repeat
+        print(f"{label:>10}: {timings[label] * 1000:.2f} ms per page, {len(athletes)} athletes")
+    print(f"   speedup: {timings['soup'] / timings['microdata']:.1f}x")
+    return timings
+
+
+# Extracts the athletes of a static Sidearm roster page, only its roster lists are parsed into soup.
+# Rows carry the raw Hometown, and the raw Name of athletes without separate first and last names.
+# Returns None when the page has no roster lists, as dynamically generated pages do
+def extract_sidearm_athletes(text, netloc):
+    teams = BeautifulSoup(text, "html.parser", parse_only=SIDEARM_STRAINER).find_all(SIDEARM_STRAINER)
+    if not teams:
+        return None
+    roster = []
+    for team in teams:
+        roster.extend(team.find_all("li", {"class": "sidearm-roster-player"}))
+
+    athletes = []
+    for athlete in roster:
+        row = {}
+        first_name = html_to_text(athlete.find("div", {"class": "sidearm-roster-player-first-name"}))
+        last_name = html_to_text(athlete.find("div", {"class": "sidearm-roster-player-last-name"}))
+        if first_name and last_name:
+            row["First Name"] = first_name
+            row["Last Name"] = last_name
+        else:
+            name = athlete.find("div", {"class": "sidearm-roster-player-name"})
+            #Remove jersey numbers from name section
+            row[NAME] = JERSEY_IN_NAME_RE.sub('', html_to_text(name)).strip()
+
+        image_src = athlete.find("img")
+        row['Image URL'] = (image_src.get('data-src') if image_src else None) or ''
+        row[HOMETOWN] = html_to_text(athlete.find("span", {"class": "sidearm-roster-player-hometown"}))
+
+        row['Class'] = html_to_text(athlete.find("span", {"class": "sidearm-roster-player-academic-year"}))
+        row['High School'] = html_to_text(athlete.find("span", {"class": "sidearm-roster-player-highschool"}))
+
+        position = athlete.find("div", {"class": "sidearm-roster-player-position"}).find("span", {"class": "text-bold"})
+        row['Position'] = html_to_text(position)
+
+        row['Jersey Number'] = html_to_text(athlete.find("span", {"class": "sidearm-roster-player-jersey-number"}))
+        row['Height'] = html_to_text(athlete.find("span", {"class": "sidearm-roster-player-height"}))
+        row['Weight'] = html_to_text(athlete.find("span", {"class": "sidearm-roster-player-weight"}))
+        athletes.append(row)
+    return athletes
+
+
+# Size a WARC file of an archive grows to before the next one is started
+WARC_MAX_SIZE = 1 << 30
+
+# Fields of the CDX index lines of an archive: SURT url key, 14 digit timestamp, url, mime type, status,
+# payload digest, compressed record length, record offset and WARC file name
+CDX_HEADER = " CDX N b a m s k S V g\n"
+
+# Response headers describing the transfer rather than the body, which requests has already undone
+TRANSFER_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+
+# Returns the SURT key of a url (gamecocksonline.com/sports/football/roster is
+# com,gamecocksonline)/sports/football/roster), which sorts the captures of a site together whatever its scheme
+def surt(url):
+    parsed = urlparse(url)
+    host, _, port = parsed.netloc.lower().removeprefix("www.").partition(":")
+    key = ",".join(reversed(host.split("."))) + (":" + port if port else "") + ")" + (parsed.path or "/")
+    return key + ("?" + parsed.query if parsed.query else "")
+
+
+# Returns a WARC/1.1 record of the given type with block as its content, as bytes
+def warc_record(record_type, url, date, content_type, block, **fields):
+    headers = {"WARC-Type": record_type, "WARC-Record-ID": f"<urn:uuid:{uuid.uuid4()}>",
+               "WARC-Date": date.strftime("%Y-%m-%dT%H:%M:%SZ"), **({"WARC-Target-URI": url} if url else {}),
+               **fields, "Content-Type": content_type, "Content-Length": str(len(block))}
+    head = "WARC/1.1\r\n" + "".join(f"{name}: {value}\r\n" for name, value in headers.items()) + "\r\n"
+    return head.encode("utf-8") + block + b"\r\n\r\n"
+
+
+# Compressions of archive WARC files, mapped to their suffix
+ARCHIVE_COMPRESSIONS = {"gzip": ".warc.gz", "zstd": ".warc.zst"}
+
+# Level zstd compressed archive records are written at
+ARCHIVE_ZSTD_LEVEL = 12
+
+# Size of the zstd dictionaries trained for each platform, the zstd tool's default
+ZSTD_DICTIONARY_SIZE = 112640
+
+# Magic number of the zstd skippable frame holding the dictionary at the start of a .warc.zst file
+ZSTD_DICTIONARY_MAGIC = 0x184D2A5D
+
+
+# Archive of the roster and bio pages fetched, in rotating compressed WARC files under root that any WARC
+# tool can read, so new extractors can be run over old pages and what a site showed on a date can be shown.
+# Every response is a gzip member or zstd frame of its own and gets a line in the CDX index file next to its
+# WARC file, so a capture is read back with one seek. Each process writes files of its own, named after its pid.
+# With zstd compression, the pages of each platform go to files of their own compressed with the platform's
+# dictionary (see train_dictionaries) if there is one, which is stored at the start of the file the way the
+# WARC zstd format has it. In replay mode nothing is fetched: pages come from the capture of the url at or before at
+# (a timestamp, or the start of one such as 2024, by default the latest capture), and urls without one raise
+# RosterScraperError
+class WarcArchive:
+    def __init__(self, root, replay=False, at=None, max_size=WARC_MAX_SIZE, compression="gzip"):
+        if compression == "zstd":
+            import_zstandard()
+        self.root = Path(root)
+        self.replay = replay
+        self.at = (at or "").ljust(14, "9")
+        self.max_size = max_size
+        self.compression = compression
+        self.settings = (str(root), replay, at, max_size, compression)
+        self.dictionary_dir = self.root / "dictionaries"
+        self.index = None
+        self.writers = {}
+        self.dictionaries = {}
+        self.lock = threading.Lock()
+
+    #Returns the zstd dictionary stored at the start of a .warc.zst file, None if it has none
+    def file_dictionary(self, name):
+        if name not in self.dictionaries:
+            with open(self.root / name, "rb") as f:
+                head = f.read(8)
+                magic, size = struct.unpack("<II", head) if len(head) == 8 else (None, 0)
+                dictionary = import_zstandard().ZstdCompressionDict(f.read(size)) if magic == ZSTD_DICTIONARY_MAGIC else None
+            self.dictionaries[name] = dictionary
+        return self.dictionaries[name]
+
+    #Starts the next WARC file for pages of platform, beginning with its dictionary and a warcinfo record
+    def rotate(self, platform):
+        writer = self.writers.get(platform)
+        if writer:
+            writer["file"].close()
+            writer["cdx"].close()
+        self.root.mkdir(parents=True, exist_ok=True)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        name = f"rosters-{now:%Y%m%d%H%M%S}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        if self.compression == "zstd":
+            zstandard = import_zstandard()
+            dictionary_path = self.dictionary_dir / f"{platform}.zdict"
+            dictionary = dictionary_path.read_bytes() if dictionary_path.exists() else b""
+            compressor = zstandard.ZstdCompressor(ARCHIVE_ZSTD_LEVEL,
+                                                  zstandard.ZstdCompressionDict(dictionary) if dictionary else None)
+            name += f"-{platform}"
+            compress = compressor.compress
+        else:
+            compress = lambda record: gzip.compress(record, COMPRESSIONS["gzip"][1])
+        writer = self.writers[platform] = {"name": name + ARCHIVE_COMPRESSIONS[self.compression], "compress": compress,
+                                           "file": open(self.root / (name + ARCHIVE_COMPRESSIONS[self.compression]), "ab"),
+                                           "cdx": open(self.root / f"{name}.cdx", "a")}
+        if self.compression == "zstd" and dictionary:
+            writer["file"].write(struct.pack("<II", ZSTD_DICTIONARY_MAGIC, len(dictionary)) + dictionary)
+        writer["cdx"].write(CDX_HEADER)
+        info = b"software: RosterScraper\r\nformat: WARC File Format 1.1\r\n"
+        self.write(writer, warc_record("warcinfo", None, now, "application/warc-fields", info,
+                                       **{"WARC-Filename": writer["name"]}))
+        return writer
+
+    #Appends a compressed record to a writer's file, returning its offset and compressed length
+    def write(self, writer, record):
+        data = writer["compress"](record)
+        offset = writer["file"].tell()
+        writer["file"].write(data)
+        writer["file"].flush()
+        return offset, len(data)
+
+    #Records a response (read in full) and the redirects that led to it
+    def record(self, r):
+        for response in [*r.history, r]:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            body = response.content
+            headers = [(name, value) for name, value in response.headers.items() if name.lower() not in TRANSFER_HEADERS]
+            head = f"HTTP/1.1 {response.status_code} {response.reason or ''}\r\n"
+            head += "".join(f"{name}: {value}\r\n" for name, value in headers + [("Content-Length", len(body))])
+            digest = base64.b32encode(hashlib.sha1(body).digest()).decode()
+            record = warc_record("response", response.url, now, "application/http;msgtype=response",
+                                 head.encode("utf-8") + b"\r\n" + body, **{"WARC-Payload-Digest": f"sha1:{digest}"})
+            mime = response.headers.get("Content-Type", "-").split(";")[0].strip() or "-"
+            platform = None
+            if self.compression == "zstd":
+                platform = fingerprint_platform(urlparse(response.url).netloc, response.headers, body[:FINGERPRINT_BYTES])
+            with self.lock:
+                writer = self.writers.get(platform)
+                if writer is None or writer["file"].tell() >= self.max_size:
+                    writer = self.rotate(platform)
+                offset, length = self.write(writer, record)
+                writer["cdx"].write(f"{surt(response.url)} {now:%Y%m%d%H%M%S} {response.url} {mime} "
+                                    f"{response.status_code} {digest} {length} {offset} {writer['name']}\n")
+                writer["cdx"].flush()
+
+    #Returns the sorted index of every capture in the archive, as (url key, timestamp, url, status, file, offset, length)
+    def load_index(self):
+        if self.index is None:
+            index = []
+            for cdx_path in self.root.glob("*.cdx"):
+                with open(cdx_path) as f:
+                    for line in f:
+                        fields = line.split()
+                        if len(fields) == 9 and fields[0] != "CDX":
+                            index.append((fields[0], fields[1], fields[2], fields[4], fields[8], int(fields[7]), int(fields[6])))
+            index.sort()
+            self.index = index
+        return self.index
+
+    #Returns the index entries of url's captures, oldest first
+    def captures(self, url):
+        index = self.load_index()
+        key = surt(url)
+        return index[bisect.bisect_left(index, (key,)):bisect.bisect_left(index, (key + "\0",))]
+
+    #Returns the index entry of url's capture at or before self.at, found by binary search, or None
+    def lookup(self, url):
+        index = self.load_index()
+        key = surt(url)
+        position = bisect.bisect_right(index, (key, self.at, "\uffff"))
+        if position and index[position - 1][0] == key:
+            return index[position - 1]
+
+    #Reads back the response of an index entry as (status, reason, headers, body). With limit, only the first limit
+    #bytes of the record are decompressed, which cuts the body short but is enough to fingerprint the page
+    def read_response(self, entry, limit=None):
+        _, _, _, _, name, offset, length = entry
+        with open(self.root / name, "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        if name.endswith(ARCHIVE_COMPRESSIONS["zstd"]):
+            decompressor = import_zstandard().ZstdDecompressor(self.file_dictionary(name))
+            record = decompressor.decompress(data) if limit is None else decompressor.stream_reader(data).read(limit)
+        else:
+            record = gzip.decompress(data) if limit is None else gzip.GzipFile(fileobj=io.BytesIO(data)).read(limit)
+        warc_head, _, block = record.partition(b"\r\n\r\n")
+        block_length = int(re.search(rb'(?im)^Content-Length:\s*(\d+)', warc_head).group(1))
+        http_head, _, body = block[:block_length].partition(b"\r\n\r\n")
+        status_line, *header_lines = http_head.decode("utf-8").split("\r\n")
+        _, status, reason = (status_line.split(" ", 2) + [""])[:3]
+        return int(status), reason, requests.structures.CaseInsensitiveDict(line.split(": ", 1) for line in header_lines), body
+
+    #Reads back a captured response as a requests Response, following archived redirects
+    def response(self, url, redirects=10):
+        entry = self.lookup(url)
+        if entry is None:
+            raise RosterScraperError(f"{url} is not in the archive")
+        r = requests.Response()
+        r.url = url
+        r.status_code, r.reason, r.headers, body = self.read_response(entry)
+        r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+        r.raw = urllib3.HTTPResponse(io.BytesIO(body), r.headers, r.status_code, preload_content=False)
+        if r.is_redirect and redirects:
+            return self.response(requests.compat.urljoin(url, r.headers["Location"]), redirects - 1)
+        return r
+
+
+# Trains a zstd dictionary of size bytes for each platform from up to samples pages of the platform in the
+# archive in root, used for the platform's pages by archives recording with zstd compression from then on.
+# Pages are fingerprinted from the start of their record and sampled before any is read in full, so only the
+# sampled pages are ever held in memory, one platform at a time. Every fifth page is held out of training to print
+# how much smaller the dictionary makes pages than gzip. Platforms with fewer than 10 pages are trained on all of
+# them, and their sizes are then measured on the pages the dictionary was trained on
+def train_dictionaries(root, size=ZSTD_DICTIONARY_SIZE, samples=1000):
+    import random
+    zstandard = import_zstandard()
+    archive = WarcArchive(root)
+    entries = [entry for entry in archive.load_index() if entry[3] == "200"]
+    random.Random(0).shuffle(entries)
+    #Record heads hold the WARC and HTTP headers ahead of the body
+    head_size = FINGERPRINT_BYTES + 65536
+    sampled = {}
+    for entry in entries:
+        _, _, headers, head = archive.read_response(entry, head_size)
+        platform = fingerprint_platform(urlparse(entry[2]).netloc, headers, head[:FINGERPRINT_BYTES])
+        if len(sampled.setdefault(platform, [])) < samples:
+            sampled[platform].append(entry)
+    if not sampled:
+        raise RosterScraperError(f"No pages to train dictionaries on in {root}")
+    archive.dictionary_dir.mkdir(parents=True, exist_ok=True)
+    for platform, platform_entries in sampled.items():
+        bodies = [archive.read_response(entry)[3] for entry in platform_entries]
+        held_out = bodies[::5] if len(bodies) >= 10 else bodies
+        training = [body for i, body in enumerate(bodies) if i % 5] if len(bodies) >= 10 else bodies
+        try:
+            dictionary = zstandard.train_dictionary(size, training)
+        except zstandard.ZstdError as error:
+            print(f"{platform}: not enough pages to train a dictionary on ({len(training)} pages, {error})")
+            continue
+        write_atomically(archive.dictionary_dir / f"{platform}.zdict", lambda path: Path(path).write_bytes(dictionary.as_bytes()))
+        compressor = zstandard.ZstdCompressor(ARCHIVE_ZSTD_LEVEL, dictionary)
+        gzipped = sum(len(gzip.compress(body, COMPRESSIONS["gzip"][1])) for body in held_out)
+        zstd_plain = sum(len(zstandard.ZstdCompressor(ARCHIVE_ZSTD_LEVEL).compress(body)) for body in held_out)
+        zstd_dictionary = sum(len(compressor.compress(body)) for body in held_out)
+        measured = "held out" if held_out is not training else "trained on, too few to hold any out,"
+        print(f"{platform}: trained on {len(training)} pages, {len(held_out)} pages {measured} of {sum(map(len, held_out))} "
+              f"bytes take {gzipped} with gzip, {zstd_plain} with zstd and {zstd_dictionary} with the dictionary "
+              f"({gzipped / zstd_dictionary:.1f}x smaller than gzip)")
+
+
+# Archive pages are recorded to or replayed from, None when pages are only fetched
+archive = None
+
+
+# Starts recording pages to the archive in root, or replaying them from it (see WarcArchive)
+def use_archive(root, replay=False, at=None, max_size=WARC_MAX_SIZE, compression="gzip"):
+    global archive
+    archive = WarcArchive(root, replay, at, max_size, compression)
+    return archive
+
+
+# Requests url over the shared session, going through the archive when one is in use: in replay mode the
+# archived response is returned without any request, otherwise the response is read in full and recorded
+def get_page(url, stream=False):
+    if archive is None:
+        return session.get(url, stream=stream)
+    if archive.replay:
+        return archive.response(url)
+    r = session.get(url)
+    archive.record(r)
+    return r
+
+
+# Prints the captures of a url in the archive in root
+def show_captures(root, url):
+    captures = WarcArchive(root).captures(url)
+    for _, timestamp, original, status, name, offset, _ in captures:
+        print(f"{timestamp} {status} {original} {name}:{offset}")
+    if not captures:
+        print(f"No captures of {url}")
+
+
+# Reads the whole of a streamed response as text
+def read_text(r, head, rest):
+    return str(head + b"".join(rest), r.encoding or "utf-8", errors="replace")
+
+
+# Downloads a team roster page, raises RosterScraperError when it can't. The url is parsed once, sites in team_hashmap
+# are dispatched by their adapter and other pages by their fingerprint. With stream set, the download stops once
+# the roster container has closed. Bio pages the site's fields follow are fetched along with the roster page.
+# Returns (netloc, platform, text, pages), everything parse_roster needs
+def fetch_roster(url, stream=True):
+    netloc = urlparse(url).netloc
+    adapter = find_site_adapter(netloc)
+
+    #Pages recently fingerprinted as unsupported fail without another request
+    if not adapter and url in unsupported_pages and time.monotonic() - unsupported_pages[url] < UNSUPPORTED_PAGE_TTL:
+        raise RosterScraperError("Unable to process data from this roster URL")
+
+    #Checks HTTP status code of user inputted URL, exits if status code is not successful (200-299)
+    r = get_page(url, stream=True)
+    if (r.status_code // 100 != 2):
+        r.close()
+        raise RosterScraperError(str(r.status_code) + " HTTP error: Please try a different URL")
+
+    #Fingerprints the platform from the start of the page before downloading the rest of it
+    head, rest = read_head(r)
+    platform = fingerprint_platform(netloc, r.headers, head)
+    if platform == UNKNOWN:
+        unsupported_pages[url] = time.monotonic()
+        r.close()
+        raise RosterScraperError("Unable to process data from this roster URL")
+
+    #Dynamically generated Sidearm pages and microdata pages of unknown sites are read in full
+    if not stream or platform == SIDEARM_DYNAMIC or (platform == MICRODATA and not adapter):
+        text = read_text(r, head, rest)
+    elif adapter:
+        text = stream_roster_text(r, head, rest, adapter.roster)
+    else:
+        text = stream_roster_text(r, head, rest, SIDEARM_ROSTER_CONTAINER, SIDEARM_ROSTER_END)
+    pages = adapter.linked_pages(text) if platform == WMT else {}
+    return netloc, platform, text, pages
+
+
+# Extracts the athletes of a roster page downloaded by fetch_roster into a DataFrame of COLUMNS,
+# raises RosterScraperError when there are none
+def parse_roster(netloc, platform, text, pages=None):
+    return rows_dataframe(extract_roster(netloc, platform, text, pages))
+
+
+# Extracts the athletes of a roster page downloaded by fetch_roster into normalized rows (see normalize_roster),
+# raises RosterScraperError when there are none. Microdata pages are read without building any soup
+# and dynamically generated Sidearm pages are never parsed as html. pages are the bio pages fetched with the roster,
+# any other page a field follows is fetched here
+def extract_roster(netloc, platform, text, pages=None):
+    adapter = find_site_adapter(netloc)
+    if platform == MICRODATA:
+        athletes = extract_microdata(text, netloc, adapter)
+    elif platform == WMT:
+        athletes = adapter.extract(text, pages)
+    else:
+        athletes = extract_sidearm_athletes(text, netloc) if platform == SIDEARM_STATIC else None
+
+    #Sidearm pages without roster lists ship the roster as JSON instead
+    if athletes is None:
+        athletes = extract_sidearm_json(text, netloc)
+        if not athletes:
+            raise RosterScraperError("Unable to process data from dynamically generated Sidearm URL")
+        platform = SIDEARM_DYNAMIC
+    if not athletes:
+        raise RosterScraperError("Please double check your URL")
+    return normalize_roster(athletes, netloc, platform, adapter)
+
+
+# Width of the athlete photos asked for from image CDNs, set with --image-width or the ROSTERSCRAPER_IMAGE_WIDTH
+# variable. At 0 every athlete gets their full size image
+IMAGE_WIDTH = int(os.environ.get("ROSTERSCRAPER_IMAGE_WIDTH", 300))
+
+# Image size policies of the platforms, telling how to ask their image CDN for a smaller rendition of an athlete photo:
+# "query" sets resize parameters in the query string of the image URL, keeping its other parameters, "pattern" and "replace" rewrite the URL
+# with a regex substitution. {width} in query values and replace strings stands for IMAGE_WIDTH. Platforms without
+# one get their full size images. Image CDNs differ between WMT sites, so WMT sites get a policy from their site
+# definition ("image_size")
+IMAGE_SIZE_POLICIES = {
+    SIDEARM_STATIC: {"query": {"width": "{width}", "quality": 80}},
+    SIDEARM_DYNAMIC: {"query": {"width": "{width}", "quality": 80}},
+}
+
+
+# Returns the parameters of a "query" image size policy, asking for images IMAGE_WIDTH wide
+def image_size_query(policy):
+    return {key: str(value).format(width=IMAGE_WIDTH) for key, value in policy["query"].items()}
+
+
+# Returns the URLs of the renditions of a Series of image URLs asked for by an image size policy. URLs without
+# a query string get the policy's parameters appended at once, the others have them merged in one by one
+def sized_image_urls(images, policy):
+    if "query" in policy:
+        sized = images + "?" + urlencode(image_size_query(policy))
+        has_query = images.str.contains("?", regex=False)
+        if has_query.any():
+            sized[has_query] = images[has_query].map(lambda image_url: sized_image_url(image_url, policy))
+        return sized
+    return images.str.replace(policy["pattern"], policy["replace"].format(width=IMAGE_WIDTH), regex=True)
+
+
+# Builds the DataFrame of a roster from the rows of an extractor, normalizing whole columns at once rather than
+# athlete by athlete: raw names and hometowns are split into their columns (single word names get an empty
+# Last Name), emails are made up from the names, and image URLs are cleaned up the platform's way and then
+# pointed at the rendition asked for by the image size policy of the site or platform, the full size image
+# being kept as the Original Image URL
+def normalize_athletes(athletes, netloc, platform, adapter=None):
+    text_columns = [column for column in COLUMNS if column not in MEASUREMENT_COLUMNS]
+    df = pd.DataFrame(athletes, columns=[*text_columns, NAME, HOMETOWN]).fillna("").astype(str)
+
+    names = df[NAME].str.replace(WHITESPACE_PATTERN, " ", regex=True).str.strip()
+    use_name = (names != "") & (df['First Name'] == "") & (df['Last Name'] == "")
+    df['First Name'] = names.str.replace(AFTER_FIRST_WORD_PATTERN, "", regex=True).where(use_name, df['First Name'])
+    df['Last Name'] = names.str.replace(FIRST_WORD_PATTERN, "", regex=True).where(use_name, df['Last Name'])
+    emails = df['First Name'].str.replace(" ", "", regex=False) + "+" + df['Last Name'].str.replace(" ", "", regex=False) + "@example.com"
+    df['Email'] = df['Email'].where(df['Email'] != "", emails)
+
+    hometowns = df[HOMETOWN]
+    use_hometown = hometowns != ""
+    df['Hometown City'] = hometowns.str.replace(AFTER_CITY_PATTERN, "", regex=True).where(use_hometown, df['Hometown City'])
+    states = hometowns.str.replace(CITY_PATTERN, "", regex=True).str.replace(",", " ", regex=False)
+    df['Hometown State'] = states.where(use_hometown, df['Hometown State'])
+
+    images = df['Image URL']
+    has_image = images != ""
+    if platform in (SIDEARM_STATIC, SIDEARM_DYNAMIC):
+        #Sidearm image urls carry their display size as query parameters and are often relative
+        images = images.str.replace(QUERY_PATTERN, "", regex=True)
+        images = images.where(~has_image | images.str.contains(ABSOLUTE_URL_PATTERN, regex=True), netloc + images)
+    else:
+        images = images.str.replace(SIZE_RE.pattern, "", regex=True)
+    df['Original Image URL'] = images
+    policy = adapter.image_size if adapter and adapter.image_size is not None else IMAGE_SIZE_POLICIES.get(platform)
+    df['Image URL'] = sized_image_urls(images, policy).where(has_image, "") if policy and IMAGE_WIDTH else images
+    return df[text_columns]
+
+
+# Heights as feet and inches ("6-2", "6'2\"", "6′2″", "6 ft 2"), centimetres, metres or inches alone
+HEIGHT_FEET_PATTERN = r"^\s*(\d)\s*(?:-|'|’|′|ft\.?|feet)\s*(\d{1,2}(?:\.\d+)?)?"
+HEIGHT_CM_PATTERN = r'(\d{2,3}(?:\.\d+)?)\s*cm'
+HEIGHT_M_PATTERN = r'(\d\.\d{1,2})\s*m\b'
+HEIGHT_INCHES_PATTERN = r'^\s*(\d{2}(?:\.\d+)?)\s*(?:in\.?|inches|"|”|″)?\s*$'
+
+# Weights in pounds ("215", "215 lbs") or kilograms
+WEIGHT_PATTERN = r'(\d{2,3}(?:\.\d+)?)\s*(lbs?|pounds|kg)?'
+
+# Redshirt markers of a class ("R-Jr.", "RS So.", "RSr.", "Redshirt Freshman", "Sr. (R)"), and the start of the class
+# left once the marker is removed, mapped to its year. Graduate students count as fifth years. A class written
+# right after an R ("RSr.") is captured so removing the marker (replacing it with REDSHIRT_REMOVAL) keeps it
+REDSHIRT_PATTERN = r'^\s*(?:r-|rs\b|r\.|redshirt\b|r(fr|so|jr|sr|gr))|\(r\)'
+REDSHIRT_REMOVAL = r'\1'
+CLASS_PATTERN = r'^\W*(fr|so|ju|jr|se|sr|gr|fi|5|si|6)'
+CLASS_YEARS = {"fr": 1, "so": 2, "ju": 3, "jr": 3, "se": 4, "sr": 4, "gr": 5, "fi": 5, "5": 5, "si": 6, "6": 6}
+
+KG_TO_LBS = 2.20462
+
+
+# Returns what group of pattern captures in each value of a Series, missing where the pattern doesn't match.
+# Matching values are rewritten to the group behind a marker with a regex replace, which pandas runs as a pyarrow
+# kernel where extract matches values one at a time in Python
+def extract_group(values, pattern, group=1):
+    marked = values.str.replace(f"(?s)^.*?(?:{pattern}).*$", f"\x01\\{group}", regex=True)
+    return marked.str.slice(1).where(marked.str.startswith("\x01"))
+
+
+# Adds the MEASUREMENT_COLUMNS to a roster DataFrame, parsing its Height, Weight and Class columns
+# a whole column at a time: height in inches, weight in pounds, class year and redshirt flag.
+# Values that can't be parsed are left missing
+def add_measurement_columns(df):
+    number = lambda values, pattern, group=1: pd.to_numeric(extract_group(values, pattern, group), errors="coerce")
+    heights = df['Height'].str.lower()
+    inches = number(heights, HEIGHT_FEET_PATTERN) * 12 + number(heights, HEIGHT_FEET_PATTERN, 2).fillna(0)
+    for pattern, to_inches in ((HEIGHT_CM_PATTERN, 1 / 2.54), (HEIGHT_M_PATTERN, 100 / 2.54), (HEIGHT_INCHES_PATTERN, 1)):
+        inches = inches.fillna(number(heights, pattern) * to_inches)
+
+    weights = df['Weight'].str.lower()
+    pounds = number(weights, WEIGHT_PATTERN)
+    pounds = pounds.where(~weights.str.contains("kg", regex=False), pounds * KG_TO_LBS)
+
+    classes = df['Class'].str.lower()
+    unmarked = classes.str.replace(REDSHIRT_PATTERN, REDSHIRT_REMOVAL, regex=True)
+    class_years = extract_group(unmarked, CLASS_PATTERN).map(CLASS_YEARS)
+    #Classes are redshirts when they had a marker to remove. Athletes without a class year are
+    #neither known to be redshirts nor known not to be
+    redshirts = (unmarked != classes).astype("boolean").where(class_years.notna())
+
+    df = df.assign(**{'Height (in)': inches.round(1), 'Weight (lbs)': pounds.round(1), 'Class Year': class_years,
+                      'Redshirt': redshirts})
+    return typed_columns(df)[COLUMNS]
+
+
+# Casts the MEASUREMENT_COLUMNS of a DataFrame to their dtypes, as rows built from tuples lose them
+def typed_columns(df):
+    return df.astype({column: dtype for column, dtype in MEASUREMENT_COLUMNS.items() if column in df.columns})
+
+
+# Returns the rows of a roster DataFrame as tuples of plain Python values, missing values being None,
+# the form rows take through the batch pipeline, snapshots and databases
+def roster_rows(df):
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+# Returns a roster DataFrame of COLUMNS from its rows
+def rows_dataframe(rows):
+    return typed_columns(pd.DataFrame(rows, columns=COLUMNS))
+
+
+# Rosters of at least this many athletes are normalized a column at a time (normalize_athletes and
+# add_measurement_columns), smaller ones athlete by athlete, which is faster below it (see benchmark_normalize)
+VECTORIZED_NORMALIZE_ATHLETES = 4000
+
+# Compiled forms of the patterns, for rosters normalized athlete by athlete
+WHITESPACE_RE = re.compile(WHITESPACE_PATTERN)
+ABSOLUTE_URL_RE = re.compile(ABSOLUTE_URL_PATTERN)
+HEIGHT_FEET_RE = re.compile(HEIGHT_FEET_PATTERN)
+HEIGHT_RES = ((re.compile(HEIGHT_CM_PATTERN), 1 / 2.54), (re.compile(HEIGHT_M_PATTERN), 100 / 2.54),
+              (re.compile(HEIGHT_INCHES_PATTERN), 1))
+WEIGHT_RE = re.compile(WEIGHT_PATTERN)
+REDSHIRT_RE = re.compile(REDSHIRT_PATTERN)
+CLASS_RE = re.compile(CLASS_PATTERN)
+
+
+# Returns the rendition of an image URL asked for by an image size policy, the way sized_image_urls does
+def sized_image_url(image_url, policy):
+    if "query" in policy:
+        params = image_size_query(policy)
+        url = urlsplit(image_url)
+        kept = [(key, value) for key, value in parse_qsl(url.query, keep_blank_values=True) if key not in params]
+        return urlunsplit(url._replace(query=urlencode(kept + list(params.items()))))
+    return re.sub(policy["pattern"], policy["replace"].format(width=IMAGE_WIDTH), image_url)
+
+
+# Returns the height in inches, weight in pounds, class year and redshirt flag of an athlete's
+# Height, Weight and Class, the way add_measurement_columns parses them
+def athlete_measurements(height, weight, athlete_class):
+    height = height.lower()
+    inches = None
+    feet = HEIGHT_FEET_RE.search(height)
+    if feet:
+        inches = float(feet.group(1)) * 12 + float(feet.group(2) or 0)
+    else:
+        for pattern, to_inches in HEIGHT_RES:
+            found = pattern.search(height)
+            if found:
+                inches = float(found.group(1)) * to_inches
+                break
+
+    weight = weight.lower()
+    found = WEIGHT_RE.search(weight)
+    pounds = float(found.group(1)) * (KG_TO_LBS if "kg" in weight else 1) if found else None
+
+    athlete_class = athlete_class.lower()
+    unmarked, markers = REDSHIRT_RE.subn(REDSHIRT_REMOVAL, athlete_class)
+    found = CLASS_RE.search(unmarked)
+    class_year = CLASS_YEARS[found.group(1)] if found else None
+    redshirt = markers > 0 if class_year is not None else None
+    return (None if inches is None else round(inches, 1), None if pounds is None else round(pounds, 1),
+            class_year, redshirt)
+
+
+# Normalizes the rows of an extractor into rows of COLUMNS the way normalize_athletes and add_measurement_columns
+# do, athlete by athlete
+def normalize_rows(athletes, netloc, platform, adapter=None):
+    text_columns = [column for column in COLUMNS if column not in MEASUREMENT_COLUMNS]
+    policy = adapter.image_size if adapter and adapter.image_size is not None else IMAGE_SIZE_POLICIES.get(platform)
+    rows = []
+    for athlete in athletes:
+        row = {column: "" if athlete.get(column) is None else str(athlete[column]) for column in text_columns}
+        name = " ".join((athlete.get(NAME) or "").split())
+        if name and not row['First Name'] and not row['Last Name']:
+            row['First Name'], _, row['Last Name'] = name.partition(" ")
+        if not row['Email']:
+            row['Email'] = row['First Name'].replace(" ", "") + "+" + row['Last Name'].replace(" ", "") + "@example.com"
+
+        hometown = athlete.get(HOMETOWN) or ""
+        if hometown:
+            city, _, state = hometown.partition(",")
+            row['Hometown City'], row['Hometown State'] = city, state.replace(",", " ")
+
+        image_url = row['Image URL']
+        if platform in (SIDEARM_STATIC, SIDEARM_DYNAMIC):
+            image_url = image_url.split("?")[0]
+            if image_url and not ABSOLUTE_URL_RE.search(image_url):
+                image_url = netloc + image_url
+        else:
+            image_url = SIZE_RE.sub("", image_url)
+        row['Original Image URL'] = image_url
+        row['Image URL'] = sized_image_url(image_url, policy) if image_url and policy and IMAGE_WIDTH else image_url
+
+        measurements = athlete_measurements(row['Height'], row['Weight'], row['Class'])
+        rows.append(tuple(row[column] for column in text_columns) + measurements)
+    return rows
+
+
+# Normalizes the rows of an extractor into rows of COLUMNS, tuples of plain Python values: a column at a time
+# for large rosters, athlete by athlete for the others
+def normalize_roster(athletes, netloc, platform, adapter=None):
+    if len(athletes) >= VECTORIZED_NORMALIZE_ATHLETES:
+        return roster_rows(add_measurement_columns(normalize_athletes(athletes, netloc, platform, adapter)))
+    return normalize_rows(athletes, netloc, platform, adapter)
+
+
+# Times normalizing made up Sidearm rosters of each size in counts a column at a time (normalize_athletes and
+# add_measurement_columns) and athlete by athlete (normalize_rows), both giving rows of plain Python values,
+# to show where VECTORIZED_NORMALIZE_ATHLETES should sit. Real rosters have tens to a few hundred athletes
+def benchmark_normalize(counts=(25, 100, 500, 2000, 10000), repeat=5):
+    timings = {}
+    for count in counts:
+        athletes = []
+        for i in range(count):
+            row = dict.fromkeys(COLUMNS, "")
+            row[NAME] = f"  First{i}   Middle Last{i} " if i % 3 else f"Mononym{i}"
+            row[HOMETOWN] = f"City{i}, ST" if i % 5 else ""
+            row['Image URL'] = f"/images/2023/8/1/athlete{i}.jpg?width=80&height=120&mode=crop"
+            row['Height'], row['Weight'], row['Class'] = f"6-{i % 12}", f"{180 + i % 80} lbs", ["Fr.", "R-So.", "Jr.", ""][i % 4]
+            athletes.append(row)
+
+        for label, normalize in (("per athlete", lambda: normalize_rows(athletes, "example.com", SIDEARM_STATIC)),
+                                 ("vectorized", lambda: roster_rows(add_measurement_columns(
+                                     normalize_athletes(athletes, "example.com", SIDEARM_STATIC))))):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                normalize()
+            timings[count, label] = (time.perf_counter() - start) / repeat
+        print(f"{count:>6} athletes: {timings[count, 'per athlete'] * 1000:.1f} ms athlete by athlete, "
+              f"{timings[count, 'vectorized'] * 1000:.1f} ms a column at a time")
+    return timings
+
+
+# Returns a static Sidearm roster page and a dynamic one with its roster in a __NUXT_DATA__ payload,
+# both listing the same count made up athletes
+def synthetic_sidearm_pages(count):
+    #The payload is one flat array, objects refer to their members by index
+    values = [{"players": 1}, []]
+
+    def add(value):
+        values.append(value)
+        return len(values) - 1
+
+    for i in range(count):
+        player = {"firstName": f"First{i}", "lastName": f"Last{i}", "jerseyNumber": str(i), "positionShort": "QB",
+                  "heightFeet": 6, "heightInches": i % 12, "weight": 200 + i % 50, "academicYearShort": "Jr.",
+                  "hometown": f"City{i}, Texas", "highSchool": f"School{i}"}
+        player = {key: add(value) for key, value in player.items()}
+        player["image"] = add({"url": add(f"/images/2023/athlete{i}.jpg?width=80")})
+        values[1].append(add(player))
+    dynamic = ('<html><body><div id="__nuxt"></div><script type="application/json" id="__NUXT_DATA__">'
+               + json.dumps(values) + '</script></body></html>')
+
+    items = []
+    for i in range(count):
+        items.append(f'<li class="sidearm-roster-player"><img data-src="/images/2023/athlete{i}.jpg?width=80">'
+                     f'<div class="sidearm-roster-player-name"><span class="sidearm-roster-player-jersey-number">{i}</span>'
+                     f' First{i} Last{i}</div><div class="sidearm-roster-player-position"><span class="text-bold">QB</span></div>'
+                     f'<span class="sidearm-roster-player-height">6-{i % 12}</span>'
+                     f'<span class="sidearm-roster-player-weight">{200 + i % 50}</span>'
+                     f'<span class="sidearm-roster-player-hometown">City{i}, Texas</span>'
+                     f'<span class="sidearm-roster-player-academic-year">Jr.</span>'
+                     f'<span class="sidearm-roster-player-highschool">School{i}</span></li>')
+    static = '<html><body><ul class="sidearm-roster-players">' + "".join(items) + '</ul></body></html>'
+    return static, dynamic
+
+
+# Times parsing a dynamic Sidearm page from its __NUXT_DATA__ payload against parsing the static html of
+# the same count made up athletes, per athlete, to see what reading the JSON instead of the markup saves
+def benchmark_sidearm_json(count=100, repeat=20):
+    static, dynamic = synthetic_sidearm_pages(count)
+    timings = {}
+    for label, platform, text in (("html", SIDEARM_STATIC, static), ("json", SIDEARM_DYNAMIC, dynamic)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            df = parse_roster("example.com", platform, text)
+        timings[label] = (time.perf_counter() - start) / repeat
+        print(f"{label:>7}: {timings[label] * 1e6 / len(df.index):.1f} us per athlete, {len(df.index)} athletes")
+    print(f"speedup: {timings['html'] / timings['json']:.1f}x")
+    return timings
+
+
+# Scrapes the athletes of a team roster URL into a DataFrame of COLUMNS, raises RosterScraperError when it can't
+def scrape_roster(url, stream=True):
+    return parse_roster(*fetch_roster(url, stream))
+
+
+# Pool of worker processes parsing the roster pages of batch runs, created on first use and reused across rosters
+parser_pool = None
+parser_pool_key = None
+
+
+# Worker side of the parsing pool: parses a fetched page and sends back compact rows,
+# tuples of column values in COLUMNS order, rather than soup or dictionaries
+def parse_roster_rows(page):
+    return extract_roster(*page)
+
+
+# Sets up a parsing worker with the site definitions, the archive (for bio pages parse_roster fetches itself)
+# and the image width in use
+def init_parser_worker(sites_path, archive_settings, image_width=None):
+    global IMAGE_WIDTH
+    load_site_definitions(sites_path)
+    if archive_settings:
+        use_archive(*archive_settings)
+    if image_width is not None:
+        IMAGE_WIDTH = image_width
+
+
+# Returns the parsing pool, with one worker per core unless a size is given. Workers load the
+# site definitions, archive and image width currently in use, and the pool is only replaced when a different size,
+# archive or image width is asked for or the site definitions were loaded again since it started
+def get_parser_pool(size=None):
+    global parser_pool, parser_pool_key
+    size = size or os.cpu_count()
+    key = (size, archive.settings if archive else None, IMAGE_WIDTH, sites_generation)
+    if parser_pool is None or parser_pool_key != key:
+        shutdown_parser_pool()
+        parser_pool = ProcessPoolExecutor(size, initializer=init_parser_worker, initargs=(sites_loaded[0], *key[1:3]))
+        parser_pool_key = key
+    return parser_pool
+
+
+def shutdown_parser_pool():
+    global parser_pool
+    if parser_pool is not None:
+        parser_pool.shutdown()
+        parser_pool = None
+
+
+# Marks the end of a pipeline stage's input
+STOP = object()
+
+
+# One stage of a batch pipeline: workers threads take (url, value) items from the bounded inbox queue, run work
+# on them and put (url, result) on the next stage's inbox. While that inbox is full they block, so a saturated
+# stage holds back the stages before it instead of letting pages pile up in memory. Time spent working and
+# time spent blocked on the next stage are tracked for the utilization report, which ends with details() if given
+class PipelineStage:
+    def __init__(self, name, work, workers, queue_size, outbox=None, details=None):
+        self.name = name
+        self.work = work
+        self.details = details
+        self.workers = workers
+        self.inbox = queue.Queue(queue_size)
+        self.outbox = outbox
+        self.failures = []
+        self.done = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.lock = threading.Lock()
+        self.threads = [threading.Thread(target=self.run, name=f"{name}-{i}", daemon=True) for i in range(workers)]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+
+    def run(self):
+        while True:
+            item = self.inbox.get()
+            if item is STOP:
                 return
+            url, value = item
+            start = time.perf_counter()
+            try:
+                result = self.work(url, value)
+            #Any error fails this url only, the rest of the batch carries on
+            except Exception as error:
+                with self.lock:
+                    self.failures.append((url, error))
+                    self.busy += time.perf_counter() - start
+                continue
+            worked = time.perf_counter()
+            if self.outbox is not None:
+                self.outbox.inbox.put((url, result))
+            with self.lock:
+                self.done += 1
+                self.busy += worked - start
+                self.blocked += time.perf_counter() - worked
+
+    #Waits for every item already queued to go through the stage
+    def stop(self):
+        for _ in self.threads:
+            self.inbox.put(STOP)
+        for thread in self.threads:
+            thread.join()
+
+    def report(self, elapsed):
+        capacity = max(elapsed * self.workers, 1e-9)
+        report = (f"{self.name}: queue {self.inbox.qsize()}/{self.inbox.maxsize}, {self.busy / capacity:.0%} busy, "
+                  f"{self.blocked / capacity:.0%} blocked, {self.done} done, {len(self.failures)} failed")
+        return f"{report}, {self.details()}" if self.details else report
+
+
+# Batch pipeline connecting a fetch stage (fetchers threads downloading pages over the shared session),
+# a parse stage (one thread per worker of the parsing pool) and a write stage (writers threads handing rows to sink)
+# with bounded queues of queue_size items each. sink is called as sink(url, rows) with rows as COLUMNS tuples.
+# Given an ImageStore as images, an image stage between parse and write downloads each roster's photos into it
+# and adds their IMAGE_PATH_COLUMN to the rows.
+# The state of every stage is printed every report_every seconds, and once more at the end
+class RosterPipeline:
+    def __init__(self, sink, fetchers=8, parsers=None, writers=1, queue_size=16, report_every=5.0, stream=True,
+                 images=None):
+        pool = get_parser_pool(parsers)
+        self.write = PipelineStage("write", sink, writers, queue_size)
+        self.stages = [self.write]
+        if images is not None:
+            self.images = PipelineStage("images", lambda url, rows: images.add_image_paths(rows), 2, queue_size, self.write,
+                                        lambda: f"{images.failed} images failed")
+            self.stages.insert(0, self.images)
+        self.parse = PipelineStage("parse", lambda url, page: pool.submit(parse_roster_rows, page).result(),
+                                   parsers or os.cpu_count(), queue_size, self.stages[0])
+        self.fetch = PipelineStage("fetch", lambda url, value: fetch_roster(url, stream), fetchers, queue_size, self.parse)
+        self.stages = [self.fetch, self.parse, *self.stages]
+        self.report_every = report_every
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        return " | ".join(stage.report(elapsed) for stage in self.stages)
 
-            for athlete in roster:
-                first_name = html_to_text(athlete.find("div", {"class", "sidearm-roster-player-first-name"}))
-                last_name = html_to_text(athlete.find("div", {"class", "sidearm-roster-player-last-name"}))
-                if not first_name or not last_name:
-                    name = athlete.find("div", {"class", "sidearm-roster-player-name"})
-                    name = html_to_text(name)
-                    #Remove jersey numbers from name section
-                    name = re.sub(r'[^a-zA-Z .-]+', '', name).strip()
-                    first_name = name.split(" ", 1)[0]
-                    last_name = name.split(" ", 1)[1]
-
-                data["First Name"].append(first_name)
-                data["Last Name"].append(last_name)
-
-                email = str(first_name.replace(" ", "") + "+" +
-                                  last_name.replace(" ", "") + "@example.com")
-                data['Email'].append(email)
-
-                image_src = athlete.find("img")
-                if image_src:
+    def print_reports(self, finished):
+        while not finished.wait(self.report_every):
+            print(self.report(), file=sys.stderr)
+
+    #Runs every url through the pipeline, returns the (url, error) failures of all stages
+    def run(self, urls):
+        self.started = time.perf_counter()
+        finished = threading.Event()
+        threading.Thread(target=self.print_reports, args=(finished,), daemon=True).start()
+        for stage in self.stages:
+            stage.start()
+        for url in urls:
+            self.fetch.inbox.put((url, None))
+        for stage in self.stages:
+            stage.stop()
+        finished.set()
+        print(self.report(), file=sys.stderr)
+        return [failure for stage in self.stages for failure in stage.failures]
+
+
+# Times batches of count made up Sidearm rosters of athletes athletes served from a local server, once for each
+# number of parser processes in parsers (by default powers of two up to the core count), to show how the
+# throughput of the pipeline scales with the cores parsing
+def benchmark_parsers(count=500, parsers=None, athletes=100):
+    static, _ = synthetic_sidearm_pages(athletes)
+    body = static.encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_address[1]}/sports/sport{i}/roster" for i in range(count)]
+    cores = os.cpu_count()
+    parsers = parsers or sorted({2 ** i for i in range(cores.bit_length()) if 2 ** i <= cores} | {cores})
+    timings = {}
+    try:
+        for size in parsers:
+            start = time.perf_counter()
+            failures = RosterPipeline(lambda url, rows: None, fetchers=16, parsers=size, report_every=3600).run(urls)
+            timings[size] = time.perf_counter() - start
+            print(f"{size:>3} parsers: {(count - len(failures)) / timings[size]:.1f} rosters per second, "
+                  f"{timings[parsers[0]] / timings[size]:.2f}x the {parsers[0]} parser rate, {len(failures)} failed")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return timings
+
+
+# Returns the absolute URL to download an athlete photo from, as image URLs are saved without a scheme on some sites.
+# urlparse would take the host of a URL like "example.com:8080/a.jpg" for its scheme, so the scheme is matched instead
+def image_download_url(image_url):
+    if image_url.startswith("//"):
+        return "https:" + image_url
+    return image_url if SCHEME_RE.match(image_url) else "https://" + image_url
+
+
+# The scheme of an absolute URL
+SCHEME_RE = re.compile(r'[a-zA-Z][a-zA-Z0-9+.-]*://')
+
+# File extensions of the image types served as athlete photos
+IMAGE_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif", "image/avif": ".avif"}
+
+
+# Content addressed store of athlete photos: every image is saved once as <sha256>.<ext> under a folder named by
+# the first two characters of its hash, however many rows and seasons link to it. Downloads are logged to
+# index.jsonl, mapping each image URL to its file, so a run picks up where an interrupted one stopped.
+# Images are downloaded over the shared session by workers threads, failed downloads are logged and counted
+class ImageStore:
+    def __init__(self, root, workers=16):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="images")
+        self.paths = {}
+        self.failed = 0
+        self.lock = threading.Lock()
+        index_path = self.root / "index.jsonl"
+        if index_path.exists():
+            with open(index_path) as f:
+                for line in f:
                     try:
-                        image_url = image_src['data-src']
-                        image_url = image_url.split("?")[0]
-                        if not is_absolute(image_url):
-                            image_url = urlparse(url).netloc + image_url
-                    except:
-                        image_url = None
-                else:
-                    image_url = None
-                data['Image URL'].append(image_url)
-
-                hometown_data = athlete.find(
-                    "span", {"class": "sidearm-roster-player-hometown"})
-                hometown_data = html_to_text(hometown_data)
-
-                hometown_city = hometown_data.split(",")[0]
-                data['Hometown City'].append(hometown_city)
-
-                hometown_state = " ".join(hometown_data.split(",")[1:])
-                data['Hometown State'].append(hometown_state)
-
-
-                year = athlete.find(
-                    "span", {"class": "sidearm-roster-player-academic-year"})
-                year = html_to_text(year)
-                data['Class'].append(year)
-
-                high_school = athlete.find(
-                    "span", {"class": "sidearm-roster-player-highschool"})
-                high_school = html_to_text(high_school)
-                data['High School'].append(high_school)
-
-                position = athlete.find("div", {
-                                        "class": "sidearm-roster-player-position"}).find("span", {"class": "text-bold"})
-                position = html_to_text(position)
-                data['Position'].append(position)
-
-                jersey_number = athlete.find(
-                    "span", {"class": "sidearm-roster-player-jersey-number"})
-                jersey_number = html_to_text(jersey_number)
-                data['Jersey Number'].append(jersey_number)
-
-                height = athlete.find(
-                    "span", {"class": "sidearm-roster-player-height"})
-                height = html_to_text(height)
-                data['Height'].append(height)
-
-                weight = athlete.find(
-                    "span", {"class": "sidearm-roster-player-weight"})
-                weight = html_to_text(weight)
-                data['Weight'].append(weight)
-                
+                        entry = json.loads(line)
+                    except ValueError:
+                        #A line cut short by a crash
+                        continue
+                    self.paths[entry["url"]] = entry["path"]
+        self.index = open(index_path, "a")
+
+    #Returns the local path of an image URL, downloading it unless an earlier download is still in the store
+    def download(self, image_url):
+        path = self.paths.get(image_url)
+        if path is not None and (self.root / path).exists():
+            return self.root / path
+
+        r = session.get(image_download_url(image_url), timeout=20)
+        r.raise_for_status()
+        content_type = r.headers.get("Content-Type", "").split(";")[0].strip()
+        extension = IMAGE_EXTENSIONS.get(content_type) or Path(urlparse(r.url).path).suffix.lower() or ".img"
+        digest = hashlib.sha256(r.content).hexdigest()
+        path = Path(digest[:2]) / f"{digest}{extension}"
+        if not (self.root / path).exists():
+            (self.root / path.parent).mkdir(exist_ok=True)
+            write_atomically(self.root / path, lambda temp_path: temp_path.write_bytes(r.content))
+        with self.lock:
+            self.paths[image_url] = path.as_posix()
+            self.index.write(json.dumps({"url": image_url, "path": path.as_posix()}) + "\n")
+            self.index.flush()
+        return self.root / path
+
+    #Downloads the photos of a roster's rows concurrently and returns the rows with their IMAGE_PATH_COLUMN,
+    #left empty for athletes without a photo or whose photo failed to download
+    def add_image_paths(self, rows):
+        image_url = COLUMNS.index("Image URL")
+
+        def local_path(url):
+            try:
+                return str(self.download(url))
+            except (requests.RequestException, OSError) as error:
+                with self.lock:
+                    self.failed += 1
+                print(f"{url}: {error}", file=sys.stderr)
+                return ""
+
+        urls = list(dict.fromkeys(row[image_url] for row in rows if row[image_url]))
+        paths = dict(zip(urls, self.pool.map(local_path, urls)))
+        return [(*row, paths.get(row[image_url], "")) for row in rows]
+
+    def close(self):
+        self.pool.shutdown()
+        self.index.close()
+
+
+# Width and height of athlete thumbnails, the 3:4 portrait of a badge photo
+THUMBNAIL_SIZE = (300, 400)
+
+# Pillow format and file extension of each thumbnail format
+THUMBNAIL_FORMATS = {"webp": ("WEBP", ".webp"), "jpeg": ("JPEG", ".jpg")}
+
+# A sha256 hex digest, the name of every file in an ImageStore
+SHA256_RE = re.compile(r'[0-9a-f]{64}')
+
+
+# Imports Pillow, which is only needed for thumbnails
+def import_pillow():
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        raise RosterScraperError("Pillow is needed to make thumbnails")
+    return Image, ImageOps
+
+
+# Worker side of make_thumbnails: crops an image around its centre to the aspect ratio of size,
+# resizes it to size and re-encodes it to destination at the given quality
+def make_thumbnail(source, destination, size, image_format, quality):
+    Image, ImageOps = import_pillow()
+    with Image.open(source) as image:
+        thumbnail = ImageOps.fit(ImageOps.exif_transpose(image).convert("RGB"), size, Image.LANCZOS)
+    write_atomically(destination, lambda path: thumbnail.save(path, THUMBNAIL_FORMATS[image_format][0], quality=quality))
+    return destination
+
+
+# Makes a thumbnail in thumbnail_dir of every athlete photo of a roster DataFrame, such as one from convert_url_to_df,
+# in a pool of workers processes, and returns the DataFrame with a Thumbnail Path column. Photos not downloaded yet
+# (without an IMAGE_PATH_COLUMN) are downloaded into images, an ImageStore. Thumbnails are named by the content hash
+# of their photo and their settings, so photos already processed with the same settings are skipped
+def make_thumbnails(df, thumbnail_dir, images=None, size=THUMBNAIL_SIZE, image_format="webp", quality=80, workers=None):
+    import_pillow()
+    failed_downloads = 0
+    if IMAGE_PATH_COLUMN not in df.columns:
+        if images is None:
+            raise RosterScraperError("The athlete photos need downloading into an image store first")
+        failed_downloads = images.failed
+        rows = images.add_image_paths(roster_rows(df.reindex(columns=COLUMNS)))
+        df = df.assign(**{IMAGE_PATH_COLUMN: [row[-1] for row in rows]})
+        failed_downloads = images.failed - failed_downloads
+
+    thumbnail_dir = Path(thumbnail_dir)
+    thumbnail_dir.mkdir(parents=True, exist_ok=True)
+    suffix = f"-{size[0]}x{size[1]}-q{quality}{THUMBNAIL_FORMATS[image_format][1]}"
+    thumbnails = {}
+    for source in df[IMAGE_PATH_COLUMN].dropna().unique():
+        if source and source not in thumbnails:
+            stem = Path(source).stem
+            content_hash = stem if SHA256_RE.fullmatch(stem) else file_hash(source)
+            thumbnails[source] = thumbnail_dir / f"{content_hash}{suffix}"
+    pending = {source: destination for source, destination in thumbnails.items() if not destination.exists()}
+
+    failed = set()
+    with ProcessPoolExecutor(workers) as pool:
+        futures = {pool.submit(make_thumbnail, source, destination, size, image_format, quality): source
+                   for source, destination in pending.items()}
+        for future in futures:
+            try:
+                future.result()
+            except Exception as error:
+                failed.add(futures[future])
+                print(f"{futures[future]}: {error}", file=sys.stderr)
+    print(f"Made {len(pending) - len(failed)} thumbnails, {len(thumbnails) - len(pending)} already made, {len(failed)} failed, "
+          f"{failed_downloads} photos failed to download", file=sys.stderr)
+    return df.assign(**{"Thumbnail Path": [str(thumbnails[source]) if source in thumbnails and source not in failed else ""
+                                           for source in df[IMAGE_PATH_COLUMN]]})
+
+
+# Makes thumbnails of the athlete photos of a team roster URL, or of a roster dataset saved as CSV or Parquet,
+# into os_path/thumbnails, downloading the photos into os_path/images unless image_dir is given.
+# The roster is saved in os_path with its Image Path and Thumbnail Path columns
+def save_thumbnails(source, os_path, image_dir=None, size=THUMBNAIL_SIZE, image_format="webp", quality=80, workers=None):
+    if is_absolute(source):
+        df = scrape_roster(source)
+        name = generate_file_name(source)
+    else:
+        df = pd.read_parquet(source) if source.endswith(".parquet") else pd.read_csv(source, dtype=str, keep_default_na=False)
+        name = Path(source).stem
+    images = ImageStore(image_dir or Path(os_path) / "images")
+    try:
+        df = make_thumbnails(df, Path(os_path) / "thumbnails", images, size, image_format, quality, workers)
+    finally:
+        images.close()
+    outputfile = Path(os_path) / f"{name}-thumbnails.csv"
+    write_atomically(outputfile, lambda path: df.to_csv(path, index=False))
+    print(f"Saved {len(df.index)} athletes with their thumbnails to {outputfile}")
+    return outputfile
+
+
+# Returns the columns of a roster's rows: COLUMNS, followed by IMAGE_PATH_COLUMN for rows from the image stage
+def row_columns(rows):
+    return COLUMNS + [IMAGE_PATH_COLUMN] if rows and len(rows[0]) > len(COLUMNS) else COLUMNS
+
+
+# Formats written a row at a time, which can also be compressed
+TEXT_FORMATS = ("csv", "jsonl")
+
+# Compressions of text output, with the suffix they add to file names and the level used when none is given
+COMPRESSIONS = {"gzip": (".gz", 6), "zstd": (".zst", 3)}
+
+
+# Imports zstandard, which is only needed for zstd compressed output
+def import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RosterScraperError("zstandard is needed for zstd compressed files")
+    return zstandard
+
+
+# Raises RosterScraperError if output in file_format with compression can't be written, before any roster is scraped
+def check_output_format(file_format, compression=None):
+    if compression and file_format not in TEXT_FORMATS:
+        raise RosterScraperError("Only CSV and JSON Lines files can be compressed")
+    if file_format == "parquet":
+        import_pyarrow()
+    if compression == "zstd":
+        import_zstandard()
+
+
+# Returns the suffix of files in file_format with compression, such as .csv or .jsonl.gz
+def output_suffix(file_format, compression=None):
+    return f".{file_format}" + (COMPRESSIONS[compression][0] if compression else "")
+
+
+# Returns the text format and compression a file name asks for with its suffix, or None when it asks for neither
+def text_output_format(filename):
+    for file_format in TEXT_FORMATS:
+        for compression in (None, *COMPRESSIONS):
+            if filename.endswith(output_suffix(file_format, compression)):
+                return file_format, compression
+
+
+# Opens path for writing text, compressed at level (by default the compression's usual level)
+# into a file the gzip and zstd tools can read
+def open_text_output(path, compression=None, level=None):
+    if compression is None:
+        return open(path, "w", encoding="utf-8", newline="")
+    level = COMPRESSIONS[compression][1] if level is None else level
+    if compression == "gzip":
+        return gzip.open(path, "wt", compresslevel=level, encoding="utf-8", newline="")
+    writer = import_zstandard().ZstdCompressor(level=level).stream_writer(open(path, "wb"))
+    return io.TextIOWrapper(writer, encoding="utf-8", newline="")
+
+
+# Writes rows (tuples of plain Python values, see roster_rows) to path as CSV with a header, the way
+# DataFrame.to_csv does, or as JSON Lines with an object per athlete. Rows are encoded and compressed
+# one at a time as they are written, so no copy of the whole file is ever held in memory
+def write_rows(path, columns, rows, file_format="csv", compression=None, level=None):
+    with open_text_output(path, compression, level) as f:
+        if file_format == "jsonl":
+            for row in rows:
+                f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
         else:
-            sg.popup_error("Unable to process data from dynamically generated Sidearm URL", title="")
-            return
-    
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(columns)
+            writer.writerows(rows)
+
+
+# Saves a roster's rows to outputfile, atomically: Parquet goes through a frame of the named DataFrame backend,
+# CSV and JSON Lines are written a row at a time
+def save_rows(outputfile, rows, file_format="csv", compression=None, level=None, backend=None):
+    if file_format == "parquet":
+        backend = dataframe_backend(backend)
+        backend.write(backend.frame(rows, row_columns(rows), {}), outputfile, file_format)
+    else:
+        write_atomically(outputfile, lambda path: write_rows(path, row_columns(rows), rows, file_format, compression, level))
+
+
+# Returns a pipeline sink saving each roster as its own file in os_path, as CSV, JSON Lines (both can be
+# compressed with gzip or zstd at level) or Parquet (which needs pyarrow), built with the named DataFrame backend
+def file_sink(os_path, file_format="csv", compression=None, level=None, backend=None):
+    check_output_format(file_format, compression)
+    dataframe_backend(backend)
+
+    def write(url, rows):
+        outputfile = Path(os_path) / f"{generate_file_name(url)}{output_suffix(file_format, compression)}"
+        save_rows(outputfile, rows, file_format, compression, level, backend)
+        return outputfile
+    return write
+
+
+# Writes a file by having write create a temporary file next to it, which is synced to disk and renamed over path,
+# so a crash leaves either the previous file or the complete new one and never a half written one
+def write_atomically(path, write):
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        write(temp_path)
+        with open(temp_path, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+# Returns the sha256 of a file's content
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Checkpoint journal of a batch run: a JSON Lines file getting one entry per finished url, with its status,
+# output file and the sha256 of the output. Every entry is flushed and synced to disk before the next one is written,
+# so after a crash the journal tells which rosters are already saved
+class BatchJournal:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.completed = {}
+        self.lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        #A line cut short by a crash
+                        continue
+                    if entry.get("status") == "done":
+                        self.completed[entry["url"]] = entry
+                    else:
+                        self.completed.pop(entry.get("url"), None)
+        self.file = open(self.path, "a")
+        #Entries go on a line of their own after a line cut short by a crash
+        if self.file.tell() and not line.endswith("\n"):
+            self.file.write("\n")
+
+    #Returns true if url was saved by an earlier run and its output file is still there
+    def is_complete(self, url):
+        entry = self.completed.get(url)
+        return bool(entry) and Path(entry["output"]).exists()
+
+    def record(self, url, status, output=None, sha256=None, error=None):
+        entry = {"url": url, "status": status, "time": time.time()}
+        if output is not None:
+            entry.update({"output": str(output), "sha256": sha256})
+        if error is not None:
+            entry["error"] = str(error)
+        with self.lock:
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            if status == "done":
+                self.completed[url] = entry
+
+    def close(self):
+        self.file.close()
+
+
+# Wraps a pipeline sink so every roster it saves is recorded in the journal with its output file and content hash
+def journaled_sink(sink, journal):
+    def write(url, rows):
+        outputfile = sink(url, rows)
+        journal.record(url, "done", outputfile, file_hash(outputfile))
+        return outputfile
+    return write
+
+
+# Manifest at the root of a partitioned dataset, listing every file in it with its partition values
+MANIFEST_FILE_NAME = "_manifest.json"
+
+# Columns a partitioned dataset is split on, in folder order
+PARTITION_COLUMNS = ("school", "sport", "season")
+
+# Partition value Hive and the tools reading its layout take as missing
+HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"
+
+
+# Returns the partition values of a team roster url (its school, sport and season, see team_details)
+# and the Hive style folder they make, such as school=gamecocksonline.com/sport=football/season=2022
+def roster_partition(url, tags=None):
+    values = dict(zip(PARTITION_COLUMNS, team_details(url, tags or {})))
+    folder = Path(*[f"{column}={quote(values[column], safe='') if values[column] else HIVE_NULL}"
+                    for column in PARTITION_COLUMNS])
+    return values, folder
+
+
+# Pipeline sink saving each roster as a file (in any format of file_sink) in the partition folder of its team
+# under root, so tools reading the dataset can skip whole schools, sports or seasons. Files are named after their url
+# and written atomically, replacing the file of an earlier run. The manifest is rewritten (atomically as well)
+# every batch_size rosters and on close, which calls on_commit with the manifest entries it added.
+# tags maps urls to columns like those of CombinedSink giving the team's School, Sport and Season
+class PartitionedSink:
+    def __init__(self, root, file_format="csv", tags=None, batch_size=100, on_commit=None, compression=None, level=None,
+                 backend=None):
+        check_output_format(file_format, compression)
+        dataframe_backend(backend)
+        self.root = Path(root)
+        self.file_format = file_format
+        self.compression = compression
+        self.level = level
+        self.backend = backend
+        self.tags = tags or {}
+        self.batch_size = batch_size
+        self.on_commit = on_commit
+        self.manifest_path = self.root / MANIFEST_FILE_NAME
+        self.files = {}
+        if self.manifest_path.exists():
+            self.files = {entry["path"]: entry for entry in json.loads(self.manifest_path.read_text())["files"]}
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def __call__(self, url, rows):
+        values, folder = roster_partition(url, self.tags.get(url))
+        path = folder / f"part-{hashlib.sha1(url.encode()).hexdigest()[:16]}{output_suffix(self.file_format, self.compression)}"
+        outputfile = self.root / path
+        outputfile.parent.mkdir(parents=True, exist_ok=True)
+        save_rows(outputfile, rows, self.file_format, self.compression, self.level, self.backend)
+        entry = {"path": path.as_posix(), "url": url, **values, "athletes": len(rows), "sha256": file_hash(outputfile),
+                 "written_at": datetime.datetime.now().isoformat(timespec="seconds")}
+        with self.lock:
+            self.files[entry["path"]] = entry
+            self.pending.append(entry)
+            if len(self.pending) >= self.batch_size:
+                self.commit()
+        return outputfile
+
+    def commit(self):
+        manifest = {"format": self.file_format, "compression": self.compression, "partitioning": list(PARTITION_COLUMNS),
+                    "files": [self.files[path] for path in sorted(self.files)]}
+        self.root.mkdir(parents=True, exist_ok=True)
+        write_atomically(self.manifest_path, lambda path: Path(path).write_text(json.dumps(manifest, indent=1)))
+        if self.on_commit:
+            self.on_commit(self.pending)
+        self.pending = []
+
+    def close(self):
+        with self.lock:
+            self.commit()
+
+
+# Scrapes every team roster URL listed in url_file (one per line) and saves each roster in os_path,
+# as its own file (see file_sink) or into the folder's SQLite database. With partitioned set, the files are laid out
+# in school=/sport=/season= folders with a manifest (see PartitionedSink) instead of all in os_path.
+# Progress is journaled to journal_path (by default in os_path): rerunning the same batch skips
+# the rosters already saved and retries only the rest. With fresh set, the journal is started over.
+# Parquet files are built with the named DataFrame backend
+def save_batch(url_file, os_path, file_format="csv", journal_path=None, fresh=False, partitioned=False,
+               compression=None, level=None, backend=None, **pipeline_options):
+    if partitioned and file_format == "sqlite":
+        raise RosterScraperError("A partitioned dataset is saved as CSV, JSON Lines or Parquet files")
+    check_output_format(file_format, compression)
+    urls = [clean_url(line) for line in Path(url_file).read_text().splitlines() if line.strip()]
+    journal_path = Path(journal_path or Path(os_path) / ".rosterscraper-journal.jsonl")
+    if fresh and journal_path.exists():
+        journal_path.unlink()
+    journal = BatchJournal(journal_path)
+    pending = [url for url in urls if not journal.is_complete(url)]
+    if len(pending) < len(urls):
+        print(f"Resuming: {len(urls) - len(pending)} rosters already saved", file=sys.stderr)
+
+    batched = None
+    try:
+        if file_format == "sqlite":
+            #Rosters only count as saved once their transaction is committed
+            batched = SQLiteSink(Path(os_path) / SQLITE_FILE_NAME,
+                                 on_commit=lambda saved: [journal.record(url, "done", batched.path) for url in saved])
+            sink = batched
+        elif partitioned:
+            #or, in a partitioned dataset, once they are in the manifest
+            batched = PartitionedSink(os_path, file_format, compression=compression, level=level, backend=backend,
+                                      on_commit=lambda saved: [journal.record(entry["url"], "done", Path(os_path) / entry["path"],
+                                                                              entry["sha256"]) for entry in saved])
+            sink = batched
+        else:
+            sink = journaled_sink(file_sink(os_path, file_format, compression, level, backend), journal)
+        try:
+            failures = RosterPipeline(sink, **pipeline_options).run(pending)
+        finally:
+            if batched is not None:
+                batched.close()
+        for url, error in failures:
+            journal.record(url, "failed", error=error)
+            print(f"{url}: {error}", file=sys.stderr)
+    finally:
+        journal.close()
+    print(f"Saved {len(pending) - len(failures)} of {len(urls)} rosters to {os_path}, "
+          f"{len(urls) - len(pending)} already saved by an earlier run, {len(failures)} failed")
+
+
+# Columns repeating the same few values over and over in a combined dataset, including the tag columns
+# of combined runs, kept as pandas categories: each distinct value is stored once and rows hold small codes
+CATEGORY_COLUMNS = ['Class', 'Position', 'Hometown State', 'High School', 'Season', 'Sport', 'School', 'Conference']
+
+
+# Concatenates DataFrames with categorized CATEGORY_COLUMNS. pandas falls back to plain strings when
+# concatenating categories that differ, so those columns are concatenated with union_categoricals instead
+def concat_categorized(frames):
+    columns = [column for column in CATEGORY_COLUMNS if column in frames[0].columns]
+    df = pd.concat([frame.drop(columns=columns) for frame in frames], ignore_index=True)
+    for column in columns:
+        df[column] = pd.api.types.union_categoricals([frame[column] for frame in frames])
+    return df[frames[0].columns]
+
+
+# Imports pyarrow, which is needed for Parquet files and the arrow backend
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.csv
+        import pyarrow.parquet
+    except ImportError:
+        raise RosterScraperError("pyarrow is needed for Parquet files and the arrow backend")
+    return pyarrow
+
+
+# Imports Polars, which is only needed for the polars backend
+def import_polars():
+    try:
+        import polars
+    except ImportError:
+        raise RosterScraperError("Polars is needed for the polars backend")
+    return polars
+
+
+# Backends build the combined dataset of a run with a DataFrame library of their own. Each one turns a roster's
+# rows into a frame of its library with the roster's tag columns in front (frame), concatenates the frames of
+# a run (concat), drops athletes listed twice (deduplicate) and writes the dataset as CSV or Parquet (write)
+
+# Builds pandas DataFrames, the default, with the CATEGORY_COLUMNS as categories.
+# Frames are built column by column, each column going straight to its final dtype
+class PandasBackend:
+    def frame(self, rows, columns, tags):
+        data = {column: [value] * len(rows) for column, value in tags.items()}
+        data.update(zip(columns, list(zip(*rows)) or [()] * len(columns)))
+        return pd.DataFrame({column: pd.Categorical(values) if column in CATEGORY_COLUMNS
+                             else pd.array(values, dtype=MEASUREMENT_COLUMNS.get(column, "str"))
+                             for column, values in data.items()})
+
+    def concat(self, frames):
+        return concat_categorized(frames)
+
+    def deduplicate(self, df):
+        return df.drop_duplicates(ignore_index=True)
+
+    def write(self, df, outputfile, file_format):
+        save_dataframe(df, outputfile, file_format)
+
+
+# Builds pyarrow Tables, with the CATEGORY_COLUMNS dictionary encoded, without going through pandas
+class ArrowBackend:
+    def __init__(self):
+        self.pa = import_pyarrow()
+        self.types = {"Float64": self.pa.float64(), "Int64": self.pa.int64(), "boolean": self.pa.bool_()}
+
+    def frame(self, rows, columns, tags):
+        pa = self.pa
+        names = [*tags, *columns]
+        values = [[value] * len(rows) for value in tags.values()] + (list(zip(*rows)) or [()] * len(columns))
+        arrays = [pa.array(column, self.types.get(MEASUREMENT_COLUMNS.get(name), pa.string()))
+                  for name, column in zip(names, values)]
+        arrays = [array.dictionary_encode() if name in CATEGORY_COLUMNS else array for name, array in zip(names, arrays)]
+        return pa.table(arrays, names=names)
+
+    def concat(self, frames):
+        return self.pa.concat_tables(frames, promote_options="default").unify_dictionaries()
+
+    #Grouping on every column without threads keeps the first of each group in the order of the table
+    def deduplicate(self, df):
+        return df.group_by(df.column_names, use_threads=False).aggregate([]).select(df.column_names)
+
+    def write(self, df, outputfile, file_format):
+        if file_format == "parquet":
+            write_atomically(outputfile, lambda path: self.pa.parquet.write_table(df, path))
+        else:
+            write_atomically(outputfile, lambda path: self.pa.csv.write_csv(df, path))
+
+
+# Builds Polars DataFrames, with the CATEGORY_COLUMNS made categorical once concatenated
+class PolarsBackend:
+    def __init__(self):
+        self.pl = import_polars()
+        self.types = {"Float64": self.pl.Float64, "Int64": self.pl.Int64, "boolean": self.pl.Boolean}
+
+    def frame(self, rows, columns, tags):
+        pl = self.pl
+        schema = {column: self.types.get(MEASUREMENT_COLUMNS.get(column), pl.String) for column in columns}
+        df = pl.DataFrame(rows, schema=schema, orient="row")
+        return df.select(*[pl.lit(value, pl.String).alias(column) for column, value in tags.items()], pl.all())
+
+    def concat(self, frames):
+        pl = self.pl
+        df = pl.concat(frames, how="diagonal_relaxed")
+        return df.with_columns(pl.col(column).cast(pl.Categorical) for column in CATEGORY_COLUMNS if column in df.columns)
+
+    def deduplicate(self, df):
+        return df.unique(maintain_order=True)
+
+    def write(self, df, outputfile, file_format):
+        if file_format == "parquet":
+            write_atomically(outputfile, lambda path: df.write_parquet(path))
+        else:
+            write_atomically(outputfile, lambda path: df.write_csv(path))
+
+
+DATAFRAME_BACKENDS = {"pandas": PandasBackend, "arrow": ArrowBackend, "polars": PolarsBackend}
+
+# Backend combined datasets are built with unless a run names one, set with the ROSTERSCRAPER_BACKEND variable
+DATAFRAME_BACKEND = os.environ.get("ROSTERSCRAPER_BACKEND", "pandas")
+
+
+# Returns the backend called name, by default DATAFRAME_BACKEND
+def dataframe_backend(name=None):
+    name = name or DATAFRAME_BACKEND
+    if name not in DATAFRAME_BACKENDS:
+        raise RosterScraperError(f"Unknown DataFrame backend {name}, use one of {', '.join(DATAFRAME_BACKENDS)}")
+    return DATAFRAME_BACKENDS[name]()
+
+
+# Pipeline sink keeping every roster in memory for runs that produce one combined dataset.
+# tags maps each url to the columns (such as its season) added in front of its rows.
+# Rosters are turned into frames of the backend as they arrive, so with pandas the repeated values
+# of a large run are held once per roster and then once in the combined dataset
+class CombinedSink:
+    def __init__(self, tags, backend=None):
+        self.tags = tags
+        self.backend = dataframe_backend(backend)
+        self.frames = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, url, rows):
+        df = self.backend.frame(rows, row_columns(rows), self.tags[url])
+        with self.lock:
+            self.frames[url] = df
+
+    #Returns the combined dataset, rosters in the order of tags and athletes listed twice only once
+    def dataframe(self):
+        frames = [self.frames[url] for url in self.tags if url in self.frames]
+        if not frames:
+            return self.backend.frame([], COLUMNS, next(iter(self.tags.values()), {}))
+        return self.backend.deduplicate(self.backend.concat(frames))
+
+    def save(self, outputfile, file_format="csv"):
+        df = self.dataframe()
+        self.backend.write(df, outputfile, file_format)
+        return len(df)
+
+
+# Saves a combined dataset as CSV or Parquet, atomically
+def save_dataframe(df, outputfile, file_format="csv"):
+    if file_format == "parquet":
+        write_atomically(outputfile, lambda path: df.to_parquet(path, index=False))
+    else:
+        write_atomically(outputfile, lambda path: df.to_csv(path, index=False))
+
+
+# Returns the tags and rows of count made up rosters of 100 athletes from a conference's 16 schools,
+# with about as many distinct values in each column as a real conference wide dataset
+def synthetic_rosters(count, seed=0):
+    import random
+    rng = random.Random(seed)
+    pick = lambda prefix, distinct: f"{prefix} {rng.randrange(distinct)}"
+    classes = ["Fr.", "So.", "Jr.", "Sr.", "R-Fr.", "R-So.", "R-Jr.", "R-Sr.", "Gr."]
+    tags = {f"https://school{i % 16}.com/sports/sport{i // 16}/roster": {"Conference": "SEC", "School": f"School {i % 16}",
+                                                                       "Sport": f"sport{i // 16}"}
+            for i in range(count)}
+    rosters = {}
+    for url in tags:
+        rosters[url] = [(pick("First", 500), pick("Last", 5000), "", f"{url}/{i}.jpg", pick("City", 3000), pick("ST", 60),
+                         rng.choice(classes), pick("High School", 20000), pick("Position", 25), str(rng.randrange(100)),
+                         f"6-{rng.randrange(12)}", str(rng.randrange(150, 300)), f"{url}/{i}.jpg",
+                         None, None, None, False) for i in range(100)]
+    return tags, rosters
+
+
+# Prints the memory taken per row by a made up combined dataset of count athletes (count / 100 rosters of a
+# conference's schools) when stored as plain strings and with categories, overall and for each category column
+def memory_report(count=100000, seed=0):
+    tags, rosters = synthetic_rosters(max(count // 100, 1), seed)
+    plain = []
+    for url, rows in rosters.items():
+        df = typed_columns(pd.DataFrame(rows, columns=COLUMNS))
+        for position, (column, value) in enumerate(tags[url].items()):
+            df.insert(position, column, value)
+        plain.append(df)
+    plain = pd.concat(plain, ignore_index=True)
+    sink = CombinedSink(tags, "pandas")
+    for url, rows in rosters.items():
+        sink(url, rows)
+    categorized = sink.dataframe()
+
+    rows = len(plain.index)
+    before, after = plain.memory_usage(deep=True), categorized.memory_usage(deep=True)
+    print(f"{rows} athletes: {before.sum() / rows:.0f} bytes per row as strings, {after.sum() / rows:.0f} with categories")
+    for column in CATEGORY_COLUMNS:
+        if column in plain.columns:
+            print(f"{column:>15}: {before[column] / rows:6.1f} -> {after[column] / rows:5.1f} bytes per row, "
+                  f"{categorized[column].cat.categories.size} distinct values")
+    return before.sum() / rows, after.sum() / rows
+
+
+# Times building and saving the combined dataset of count made up rosters, as CSV and as Parquet,
+# with each installed backend. Parsing (always done with pandas) costs the same whatever the backend, it is timed
+# on a few made up Sidearm pages of 100 athletes and scaled to count rosters to show the share of a run the
+# backend accounts for. Fetching depends on the sites and is left out
+def benchmark_backends(count=500, repeat=3, parsed=5):
+    import tempfile
+    tags, rosters = synthetic_rosters(count)
+    timings = {}
+    static, _ = synthetic_sidearm_pages(100)
+    start = time.perf_counter()
+    for _ in range(parsed):
+        parse_roster("example.com", SIDEARM_STATIC, static)
+    timings["parse"] = (time.perf_counter() - start) / parsed * count
+    print(f"  parse: {timings['parse'] * 1000:.0f} ms for {count} rosters (timed on {parsed})")
+    with tempfile.TemporaryDirectory() as folder:
+        for name in DATAFRAME_BACKENDS:
+            try:
+                dataframe_backend(name)
+            except RosterScraperError as error:
+                print(f"{name:>7}: skipped, {error}")
+                continue
+            for file_format in ("csv", "parquet"):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    sink = CombinedSink(tags, name)
+                    for url, rows in rosters.items():
+                        sink(url, rows)
+                    athletes = sink.save(Path(folder) / f"{name}.{file_format}", file_format)
+                timings[name, file_format] = (time.perf_counter() - start) / repeat
+                print(f"{name:>7}: {timings[name, file_format] * 1000:.0f} ms for {athletes} athletes "
+                      f"from {count} rosters to {file_format}")
+    return timings
+
+
+# Database all SQLite output of a folder goes to
+SQLITE_FILE_NAME = "rosters.db"
+
+# Athlete columns of the SQLite database, in COLUMNS order followed by IMAGE_PATH_COLUMN,
+# and the types of the ones that aren't TEXT. Athletes are keyed within a team by name and name_ordinal,
+# which numbers the athletes of a roster sharing a name (or having none) in roster order, the first being 1
+SQLITE_COLUMNS = [re.sub(r'\W+', '_', column.lower()).strip('_') for column in COLUMNS + [IMAGE_PATH_COLUMN]]
+SQLITE_TYPES = {"height_in": "REAL", "weight_lbs": "REAL", "class_year": "INTEGER", "redshirt": "INTEGER"}
+
+SQLITE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS teams (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    school TEXT,
+    sport TEXT,
+    season TEXT,
+    conference TEXT
+);
+CREATE TABLE IF NOT EXISTS scrapes (
+    id INTEGER PRIMARY KEY,
+    team_id INTEGER NOT NULL REFERENCES teams (id),
+    scraped_at TEXT NOT NULL,
+    athletes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS athletes (
+    team_id INTEGER NOT NULL REFERENCES teams (id),
+    scrape_id INTEGER NOT NULL REFERENCES scrapes (id),
+    name_ordinal INTEGER NOT NULL DEFAULT 1,
+    {", ".join(f"{column} {SQLITE_TYPES.get(column, 'TEXT')}" for column in SQLITE_COLUMNS)},
+    PRIMARY KEY (team_id, first_name, last_name, name_ordinal)
+);
+CREATE INDEX IF NOT EXISTS athletes_name ON athletes (last_name, first_name);
+CREATE INDEX IF NOT EXISTS athletes_hometown_state ON athletes (hometown_state);
+CREATE INDEX IF NOT EXISTS scrapes_team ON scrapes (team_id);
+CREATE INDEX IF NOT EXISTS teams_school ON teams (school);
+CREATE INDEX IF NOT EXISTS teams_sport ON teams (sport);
+CREATE INDEX IF NOT EXISTS teams_season ON teams (season);
+"""
+
+SQLITE_UPSERT_TEAM = """
+INSERT INTO teams (url, school, sport, season, conference) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET school = excluded.school, sport = excluded.sport,
+    season = excluded.season, conference = coalesce(excluded.conference, teams.conference)
+"""
+
+SQLITE_UPSERT_ATHLETE = f"""
+INSERT INTO athletes (team_id, scrape_id, name_ordinal, {", ".join(SQLITE_COLUMNS)})
+VALUES (?, ?, ?, {", ".join("?" * len(SQLITE_COLUMNS))})
+ON CONFLICT (team_id, first_name, last_name, name_ordinal) DO UPDATE SET scrape_id = excluded.scrape_id,
+    {", ".join(f"{column} = excluded.{column}" for column in SQLITE_COLUMNS[2:-1])},
+    image_path = coalesce(excluded.image_path, athletes.image_path)
+"""
+
+# A season at the end of a roster URL, as in /roster/2022 or /roster/season/2022-23
+SEASON_IN_URL_RE = re.compile(r'/(\d{4}(?:-\d{2})?)/?$')
+
+
+# Opens a roster database, creating its tables and indexes. WAL mode lets readers query the database while
+# a batch is writing to it
+def open_database(path):
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.execute("PRAGMA foreign_keys = ON")
+    existing = [column[1] for column in connection.execute("PRAGMA table_info(athletes)")]
+    #Databases created before athletes were keyed by name_ordinal have their athletes table rebuilt with the new key,
+    #their stored athletes becoming the first of their name. A primary key can't be changed in place
+    rebuild = existing and "name_ordinal" not in existing
+    if rebuild:
+        connection.execute("ALTER TABLE athletes RENAME TO athletes_unordered")
+        connection.execute("DROP INDEX IF EXISTS athletes_name")
+        connection.execute("DROP INDEX IF EXISTS athletes_hometown_state")
+    connection.executescript(SQLITE_SCHEMA)
+    if rebuild:
+        copied = ", ".join(["team_id", "scrape_id"] + [column for column in SQLITE_COLUMNS if column in existing])
+        with connection:
+            connection.execute(f"INSERT INTO athletes ({copied}) SELECT {copied} FROM athletes_unordered")
+            connection.execute("DROP TABLE athletes_unordered")
+    elif existing:
+        #Databases created before a column was added get it
+        for column in SQLITE_COLUMNS:
+            if column not in existing:
+                connection.execute(f"ALTER TABLE athletes ADD COLUMN {column} {SQLITE_TYPES.get(column, 'TEXT')}")
+    return connection
+
+
+# Returns the school, sport, season and conference of a team roster URL, from its tags when given
+def team_details(url, tags):
+    season = SEASON_IN_URL_RE.search(urlparse(url).path)
+    try:
+        sport = roster_sport(url)
+    except ValueError:
+        sport = None
+    return (tags.get("School") or urlparse(url).netloc.removeprefix("www."), tags.get("Sport") or sport,
+            tags.get("Season") or (season.group(1) if season else None), tags.get("Conference"))
+
+
+# Pipeline sink loading rosters into a SQLite database with teams, scrapes and athletes tables.
+# Each roster adds a scrape and upserts its athletes, matched within a team by name and name_ordinal, so the
+# athletes of a team's latest scrape are the ones with its scrape_id. Rosters are written in one transaction
+# committed every batch_size rosters and on close, which calls on_commit with the urls it saved.
+# tags maps urls to columns like those of CombinedSink giving the team's School, Sport, Season and Conference
+class SQLiteSink:
+    def __init__(self, path, tags=None, batch_size=500, on_commit=None):
+        self.path = Path(path)
+        self.tags = tags or {}
+        self.batch_size = batch_size
+        self.on_commit = on_commit
+        self.connection = open_database(self.path)
+        self.pending = []
+        self.athletes = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, url, rows):
+        with self.lock:
+            cursor = self.connection.cursor()
+            cursor.execute(SQLITE_UPSERT_TEAM, (url, *team_details(url, self.tags.get(url, {}))))
+            team_id = cursor.execute("SELECT id FROM teams WHERE url = ?", (url,)).fetchone()[0]
+            cursor.execute("INSERT INTO scrapes (team_id, scraped_at, athletes) VALUES (?, ?, ?)",
+                           (team_id, datetime.datetime.now().isoformat(timespec="seconds"), len(rows)))
+            scrape_id = cursor.lastrowid
+            #Rows without an image path keep the one stored by an earlier scrape
+            padding = (None,) * (len(SQLITE_COLUMNS) - len(COLUMNS)) if rows and len(rows[0]) == len(COLUMNS) else ()
+            ordinals = {}
+            athletes = []
+            for row in rows:
+                ordinal = ordinals[row[:2]] = ordinals.get(row[:2], 0) + 1
+                athletes.append((team_id, scrape_id, ordinal, *row, *padding))
+            cursor.executemany(SQLITE_UPSERT_ATHLETE, athletes)
+            self.athletes += len(rows)
+            self.pending.append(url)
+            if len(self.pending) >= self.batch_size:
+                self.commit()
+        return self.path
+
+    def commit(self):
+        self.connection.commit()
+        if self.on_commit:
+            self.on_commit(self.pending)
+        self.pending = []
+
+    def close(self):
+        with self.lock:
+            self.commit()
+        self.connection.close()
+
+
+# Scrapes the rosters of tags (urls mapped to the columns added in front of their rows) in parallel into
+# one dataset saved in os_path, as name.csv or name.parquet built with the named DataFrame backend,
+# or loaded into the folder's SQLite database. unit names what the urls are in the summary
+def save_combined(tags, os_path, name, file_format="csv", unit="rosters", backend=None, **pipeline_options):
+    if file_format == "sqlite":
+        outputfile = Path(os_path) / SQLITE_FILE_NAME
+        sink = SQLiteSink(outputfile, tags)
+    else:
+        outputfile = Path(os_path) / f"{name}.{file_format}"
+        sink = CombinedSink(tags, backend)
+    try:
+        failures = RosterPipeline(sink, **pipeline_options).run(list(tags))
+    finally:
+        if file_format == "sqlite":
+            sink.close()
+    for url, error in failures:
+        print(f"{url}: {error}", file=sys.stderr)
+
+    if file_format == "sqlite":
+        athletes = sink.athletes
     else:
-       sg.popup_error("Unable to process data from this roster URL", title="")
-       return
+        athletes = sink.save(outputfile, file_format)
+    print(f"Saved {athletes} athletes from {len(tags) - len(failures)} of {len(tags)} {unit} to {outputfile}")
+    return outputfile
+
+
+# Returns the first part of a team roster URL, up to and including /roster, raises RosterScraperError
+# for URLs without /roster
+def roster_root(team_url):
+    split = team_url.split("/")
+    if "roster" not in split:
+        raise RosterScraperError(f"{team_url} is not a team roster URL, it has no /roster in it")
+    return "/".join(split[:split.index("roster") + 1])
+
+
+# Expands a team roster URL into the roster URL of every season from first_season to last_season (by default
+# the current year), keyed by season. Seasons follow the shape of the given URL: /roster/season/2022 on sites
+# using that form, and 2022-23 style seasons when the URL names one that way
+def season_urls(team_url, first_season=2010, last_season=None):
+    last_season = last_season or datetime.date.today().year
+    root = roster_root(team_url)
+    season_path = "/season/" if "season" in team_url[len(root):].split("/") else "/"
+    multi_year = bool(re.fullmatch(r'\d{4}-\d{2}', team_url.split("/")[-1]))
+    urls = {}
+    for year in range(first_season, last_season + 1):
+        season = f"{year}-{(year + 1) % 100:02d}" if multi_year else str(year)
+        urls[season] = root + season_path + season
+    return urls
+
+
+# Scrapes a team's roster for every season from first_season to last_season, fetching all seasons concurrently
+# over the shared session, and saves them as one dataset with a Season column in os_path.
+# Seasons the site has no roster for are reported and left out
+def save_season_range(team_url, os_path, first_season=2010, last_season=None, file_format="csv", **pipeline_options):
+    urls = season_urls(team_url, first_season, last_season)
+    seasons = list(urls)
+    name = f"{generate_file_name(roster_root(team_url))}-{seasons[0]}-{seasons[-1]}"
+    return save_combined({url: {"Season": season} for season, url in urls.items()}, os_path, name, file_format,
+                         "seasons", **pipeline_options)
+
+
+# Folder holding the caches kept between runs
+CACHE_DIR = Path.home() / ".rosterscraper"
+
+# Discovered roster URLs are reused for this many seconds before a school's site is crawled again
+DISCOVERY_MAX_AGE = 7 * 24 * 60 * 60
+
+# Sport pages and roster pages in sitemaps and site navigation, and the <loc> entries of a sitemap
+SPORT_PATH_RE = re.compile(r'/sports/([a-z0-9-]+)(?:/roster)?/?$')
+SPORT_HREF_RE = re.compile(r'href="(?:https?://[^/"]+)?/sports/([a-z0-9-]+)(?:/roster)?/?"', re.I)
+SITEMAP_LOC_RE = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>')
+
+# Most sitemaps followed from a sitemap index
+MAX_SITEMAPS = 20
+
+
+# Returns the sports listed in a school's sitemaps: the ones named in robots.txt, or /sitemap.xml.
+# Sitemap indexes are followed, child sitemaps being fetched concurrently
+def sitemap_sports(domain):
+    sitemaps = []
+    try:
+        r = session.get(f"https://{domain}/robots.txt", timeout=10)
+        if r.ok:
+            sitemaps = [line.split(":", 1)[1].strip() for line in r.text.splitlines() if line.lower().startswith("sitemap:")]
+    except requests.RequestException:
+        pass
+    sitemaps = sitemaps or [f"https://{domain}/sitemap.xml"]
+
+    def locations(sitemap_url):
+        try:
+            r = session.get(sitemap_url, timeout=10)
+        except requests.RequestException:
+            return []
+        return SITEMAP_LOC_RE.findall(r.text) if r.ok else []
+
+    sports = set()
+    seen = set()
+    with ThreadPoolExecutor(8) as pool:
+        while sitemaps and len(seen) < MAX_SITEMAPS:
+            batch = [url for url in sitemaps[:MAX_SITEMAPS - len(seen)] if url not in seen]
+            seen.update(batch)
+            sitemaps = []
+            for found in pool.map(locations, batch):
+                for loc in found:
+                    path = urlparse(loc).path
+                    if path.endswith(".xml"):
+                        sitemaps.append(loc)
+                    elif SPORT_PATH_RE.search(path):
+                        sports.add(SPORT_PATH_RE.search(path).group(1))
+    return sports
+
+
+# Returns the sports linked from the navigation of a school's home page
+def navigation_sports(domain):
+    try:
+        r = session.get(f"https://{domain}/", timeout=10)
+    except requests.RequestException:
+        return set()
+    return {sport.lower() for sport in SPORT_HREF_RE.findall(r.text)} if r.ok else set()
+
+
+# Returns the team roster URL of every sport of a school's athletics site, from its sitemap or else its navigation.
+# The list is cached per domain in CACHE_DIR for DISCOVERY_MAX_AGE, unless refresh is set
+def discover_roster_urls(domain, refresh=False):
+    domain = domain.strip(" /").lower().removeprefix("https://").removeprefix("http://")
+    cache_file = CACHE_DIR / "discovered_rosters.json"
+    cache = json.loads(cache_file.read_text()) if cache_file.exists() else {}
+    cached = cache.get(domain)
+    if cached and not refresh and time.time() - cached["time"] < DISCOVERY_MAX_AGE:
+        return cached["urls"]
+
+    sports = sitemap_sports(domain) or navigation_sports(domain)
+    urls = [f"https://{domain}/sports/{sport}/roster" for sport in sorted(sports)]
+    if urls:
+        cache[domain] = {"time": time.time(), "urls": urls}
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        write_atomically(cache_file, lambda path: path.write_text(json.dumps(cache, indent=1)))
+    return urls
+
+
+# Returns the sport of a team roster URL (/sports/<sport>/roster)
+def roster_sport(team_url):
+    split = team_url.split("/")
+    return split[split.index("roster") - 1]
+
+
+# Discovers every sport's roster on a school's athletics site and scrapes them all in parallel into
+# one dataset with a Sport column, saved in os_path
+def save_school(domain, os_path, file_format="csv", refresh=False, **pipeline_options):
+    urls = discover_roster_urls(domain, refresh)
+    if not urls:
+        raise RosterScraperError(f"No team rosters found on {domain}")
+    return save_combined({url: {"Sport": roster_sport(url)} for url in urls}, os_path,
+                         f"{urlparse(urls[0]).netloc[:-4]}-rosters", file_format, "teams", **pipeline_options)
+
+
+# Bundled directory of conferences, their schools' athletics domains and the roster path of each sport
+DIRECTORY_PATH = SITES_PATH.with_name("conferences.json")
+
+
+# Loads the conference directory. "sports" maps each sport to its roster path on a Sidearm or WMT site and
+# "conferences" maps each conference to its schools: an athletics domain, or {"domain", "sports", "except"}
+# for schools using other roster paths or not playing some sports in the conference
+def load_team_directory(path=DIRECTORY_PATH):
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError) as error:
+        raise RosterScraperError(f"Could not load the conference directory {path}: {error}")
+
+
+# Returns the roster URL of a sport at every school of a conference, each with its Conference, School
+# and Sport columns. The conference name is matched regardless of case
+def conference_roster_urls(conference, sport, directory=None):
+    directory = directory or load_team_directory()
+    conferences = {name.lower(): name for name in directory["conferences"]}
+    if conference.lower() not in conferences:
+        raise RosterScraperError(f"Unknown conference {conference}, expected one of: {', '.join(directory['conferences'])}")
+    conference = conferences[conference.lower()]
+
+    urls = {}
+    for school, entry in directory["conferences"][conference].items():
+        if isinstance(entry, str):
+            entry = {"domain": entry}
+        if sport in entry.get("except", []):
+            continue
+        path = entry.get("sports", {}).get(sport) or directory["sports"].get(sport, sport)
+        url = f"https://{entry['domain']}/sports/{path.strip('/')}/roster"
+        urls[url] = {"Conference": conference, "School": school, "Sport": sport}
+    return urls
+
+
+# Scrapes a sport's roster at every school of a conference in parallel into one dataset with Conference,
+# School and Sport columns, saved in os_path
+def save_conference(conference, sport, os_path, file_format="csv", directory_path=DIRECTORY_PATH, **pipeline_options):
+    tags = conference_roster_urls(conference, sport, load_team_directory(directory_path))
+    if not tags:
+        raise RosterScraperError(f"No {conference} school plays {sport}")
+    name = next(iter(tags.values()))["Conference"].lower().replace(" ", "-")
+    return save_combined(tags, os_path, f"{name}-{sport}-rosters", file_format, "schools", **pipeline_options)
+
 
-    df = pd.DataFrame(data)
-    return df
+# Folder of the roster snapshot store
+SNAPSHOT_DIR = CACHE_DIR / "snapshots"
+
+# Athletes are matched between two snapshots of a roster by their first and last name
+SNAPSHOT_KEY = ("First Name", "Last Name")
+
+
+# Returns the content hash of a roster's rows
+def roster_hash(rows):
+    return hashlib.sha256(json.dumps(rows).encode()).hexdigest()
+
+
+# Local store of roster scrapes. Each team gets a folder named like its CSV file, holding one JSON file of rows per
+# snapshot, named by its timestamp, and an index.json listing the snapshots with their content hashes.
+# A scrape whose content hash matches the team's latest snapshot isn't stored again
+class SnapshotStore:
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = Path(root)
+
+    def team_dir(self, team_url):
+        return self.root / generate_file_name(team_url)
+
+    #Returns the index entries of a team's snapshots, oldest first
+    def snapshots(self, team_url):
+        index_file = self.team_dir(team_url) / "index.json"
+        return json.loads(index_file.read_text()) if index_file.exists() else []
+
+    #Returns the rows of a team's snapshot at timestamp, by default its latest one
+    def load(self, team_url, timestamp=None):
+        snapshots = self.snapshots(team_url)
+        if not snapshots:
+            raise RosterScraperError(f"No snapshots of {team_url}")
+        timestamps = [snapshot["time"] for snapshot in snapshots]
+        if timestamp is not None and timestamp not in timestamps:
+            raise RosterScraperError(f"No snapshot of {team_url} at {timestamp}, the snapshots are: {', '.join(timestamps)}")
+        timestamp = timestamp or timestamps[-1]
+        return [tuple(row) for row in json.loads((self.team_dir(team_url) / f"{timestamp}.json").read_text())]
+
+    #Stores rows as a new snapshot of the team unless its latest snapshot has the same content,
+    #returns the index entry of the snapshot it follows (None for a team's first one) and whether it was stored
+    def save(self, team_url, rows):
+        snapshots = self.snapshots(team_url)
+        previous = snapshots[-1] if snapshots else None
+        content_hash = roster_hash(rows)
+        if previous and previous["hash"] == content_hash:
+            return previous, False
+
+        team_dir = self.team_dir(team_url)
+        team_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        write_atomically(team_dir / f"{timestamp}.json", lambda path: path.write_text(json.dumps(rows)))
+        snapshots.append({"time": timestamp, "url": team_url, "hash": content_hash, "athletes": len(rows)})
+        write_atomically(team_dir / "index.json", lambda path: path.write_text(json.dumps(snapshots, indent=1)))
+        return previous, True
+
+
+# Returns a roster's rows keyed by SNAPSHOT_KEY, lowercased. Athletes sharing a name get their position on the
+# roster among them added to their key
+def rows_by_key(rows):
+    first, last = (COLUMNS.index(column) for column in SNAPSHOT_KEY)
+    keys = [f"{row[first]}\t{row[last]}".lower() for row in rows]
+    keyed = dict(zip(keys, rows))
+    if len(keyed) == len(rows):
+        return keyed
+
+    keyed = {}
+    for key, row in zip(keys, rows):
+        if key in keyed:
+            duplicate = 2
+            while (key, duplicate) in keyed:
+                duplicate += 1
+            key = (key, duplicate)
+        keyed[key] = row
+    return keyed
+
+
+# Compares two snapshots of a roster and returns the added and removed athletes' rows and, for athletes
+# in both, the changed ones as (row, {column: (old value, new value)})
+def diff_rosters(old_rows, new_rows):
+    old = rows_by_key(old_rows)
+    new = rows_by_key(new_rows)
+    changed = []
+    for key, row in new.items():
+        before = old.get(key)
+        if before is not None and before != row:
+            #Snapshots taken before a column was added only compare the columns they have
+            columns = row_columns([row])
+            fields = {columns[i]: (a, b) for i, (a, b) in enumerate(zip(before, row)) if a != b}
+            if fields:
+                changed.append((row, fields))
+    return {"added": [row for key, row in new.items() if key not in old],
+            "removed": [row for key, row in old.items() if key not in new],
+            "changed": changed}
+
+
+# Prints the changes to a roster between two snapshots
+def print_roster_changes(team_url, changes):
+    print(f"{team_url}: {len(changes['added'])} added, {len(changes['removed'])} removed, {len(changes['changed'])} changed")
+    name = lambda row: f"{row[0]} {row[1]}".strip()
+    for row in changes["added"]:
+        print(f"  + {name(row)}")
+    for row in changes["removed"]:
+        print(f"  - {name(row)}")
+    for row, fields in changes["changed"]:
+        print(f"  ~ {name(row)}: " + "; ".join(f"{column} {old!r} -> {new!r}" for column, (old, new) in fields.items()))
+
+
+# Pipeline sink storing every scraped roster in the snapshot store. Rosters whose content hash changed since
+# the team's latest snapshot are diffed against it, the others are left alone
+class SnapshotSink:
+    def __init__(self, store):
+        self.store = store
+        self.changes = {}
+        self.unchanged = []
+        self.new = []
+        self.lock = threading.Lock()
+
+    def __call__(self, url, rows):
+        rows = [tuple(row) for row in rows]
+        previous, stored = self.store.save(url, rows)
+        with self.lock:
+            if not stored:
+                self.unchanged.append(url)
+            elif previous is None:
+                self.new.append(url)
+            else:
+                self.changes[url] = diff_rosters(self.store.load(url, previous["time"]), rows)
+
+
+# Scrapes every team roster URL listed in url_file into the snapshot store and reports the changes
+# since each team's previous snapshot
+def track_rosters(url_file, snapshot_dir=SNAPSHOT_DIR, **pipeline_options):
+    urls = [clean_url(line) for line in Path(url_file).read_text().splitlines() if line.strip()]
+    sink = SnapshotSink(SnapshotStore(snapshot_dir))
+    failures = RosterPipeline(sink, **pipeline_options).run(urls)
+    for url, error in failures:
+        print(f"{url}: {error}", file=sys.stderr)
+
+    for url in urls:
+        if url in sink.changes:
+            print_roster_changes(url, sink.changes[url])
+    print(f"{len(sink.changes)} rosters changed, {len(sink.unchanged)} unchanged, {len(sink.new)} new, {len(failures)} failed")
+    return sink.changes
+
+
+# Reports the changes to a team's roster between two of its snapshots, by default its latest two
+def show_roster_changes(team_url, old_timestamp=None, new_timestamp=None, snapshot_dir=SNAPSHOT_DIR):
+    store = SnapshotStore(snapshot_dir)
+    timestamps = [snapshot["time"] for snapshot in store.snapshots(team_url)]
+    if not timestamps:
+        raise RosterScraperError(f"No snapshots of {team_url}")
+    new_timestamp = new_timestamp or timestamps[-1]
+    if old_timestamp is None:
+        if new_timestamp not in timestamps or timestamps.index(new_timestamp) == 0:
+            raise RosterScraperError(f"No snapshot of {team_url} before {new_timestamp}")
+        old_timestamp = timestamps[timestamps.index(new_timestamp) - 1]
+    changes = diff_rosters(store.load(team_url, old_timestamp), store.load(team_url, new_timestamp))
+    print_roster_changes(team_url, changes)
+    return changes
+
+
+# Converts team roster data for Sidearm and WMT websites into a Pandas DataFrame
+# With stream set, the download stops once the roster container has closed
+def convert_url_to_df(url, stream=True):
+    try:
+        return scrape_roster(url, stream)
+    except RosterScraperError as error:
+        sg.popup_error(str(error), title="")
+        return
 
 #Generates file name from URL
 def generate_file_name(url):
@@ -303,8 +2875,22 @@ def save_file(team_url, os_path, csv_file_name):
             filename = csv_file_name
             if not filename:
                 filename = generate_file_name(team_url)
-            outputfile = Path(os_path) / f"{filename}.csv"
-            df.to_csv(outputfile, index=False)
+            if filename.endswith(".db"):
+                #Adds the roster to a SQLite database instead
+                database = SQLiteSink(Path(os_path) / filename)
+                database(team_url, roster_rows(df[COLUMNS]))
+                database.close()
+            elif text_output_format(filename):
+                #Names like roster.jsonl or roster.csv.gz pick the format and compression
+                try:
+                    check_output_format(*text_output_format(filename))
+                except RosterScraperError as error:
+                    sg.popup_error(str(error), title="")
+                    return
+                save_rows(Path(os_path) / filename, roster_rows(df[COLUMNS]), *text_output_format(filename))
+            else:
+                outputfile = Path(os_path) / f"{filename}.csv"
+                write_atomically(outputfile, lambda path: df.to_csv(path, index=False))
             sg.popup("File Saved", title="")
 
 #Displays csv file
@@ -349,6 +2935,53 @@ def is_valid_path(filepath):
 def clean_url(url):
     return url.strip(" /").replace(" ", "").lower()        
     
+#-------- Server Mode ---------- #
+# Serves rosters to other tools over HTTP: GET /roster?url=<team roster url> answers with the roster as CSV.
+# A missing or malformed url is a 400, a roster that can't be read a 422 and a failed request to the site a 502.
+# The site definitions file is checked before every request and reloaded when it has changed
+class RosterRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        request = urlparse(self.path)
+        if request.path != "/roster":
+            self.send_error(404)
+            return
+        url = clean_url(parse_qs(request.query).get("url", [""])[0])
+        if not url:
+            self.send_error(400, "Missing url parameter")
+            return
+        if not validators.url(url):
+            self.send_error(400, "Please enter a valid team roster URL")
+            return
+        reload_site_definitions()
+        try:
+            athletes = scrape_roster(url)
+        except RosterScraperError as error:
+            self.send_error(422, str(error))
+            return
+        except requests.RequestException as error:
+            self.send_error(502, str(error))
+            return
+
+        body = athletes.to_csv(index=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# Runs the roster server until interrupted
+def serve(host, port):
+    server = ThreadingHTTPServer((host, port), RosterRequestHandler)
+    print(f"Serving rosters on http://{host}:{port}/roster?url=<team roster url>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+#------------------ #
+
 #-------- GUI Definition ---------- #
 def main_window():
     theme = "Dark"
@@ -383,5 +3016,211 @@ def main_window():
     window.close()
 #------------------ #
 
+#-------- Command Line ---------- #
+# Options sizing each stage of a batch pipeline
+def add_pipeline_arguments(parser):
+    parser.add_argument("--fetchers", type=int, default=8, help="number of pages downloaded at once")
+    parser.add_argument("--parsers", type=int, default=None, help="number of parsing processes (default: one per core)")
+    parser.add_argument("--writers", type=int, default=1, help="number of threads writing output")
+    parser.add_argument("--queue-size", type=int, default=16, help="items each stage can have waiting before the one ahead of it blocks")
+    parser.add_argument("--report-every", type=float, default=5.0, help="seconds between stage reports")
+    parser.add_argument("--images", default=None, help="folder athlete photos are downloaded to, adding an Image Path column")
+    parser.add_argument("--downloaders", type=int, default=16, help="number of photos downloaded at once")
+
+
+def pipeline_options(args):
+    return {"fetchers": args.fetchers, "parsers": args.parsers, "writers": args.writers,
+            "queue_size": args.queue_size, "report_every": args.report_every,
+            "images": ImageStore(args.images, args.downloaders) if args.images else None}
+
+
+def command_line(args):
+    global IMAGE_WIDTH
+    parser = argparse.ArgumentParser(prog="RosterScraper", description="Team roster URL to CSV converter")
+    parser.add_argument("--image-width", type=int, default=IMAGE_WIDTH,
+                        help="width of the athlete photos asked for from image CDNs, 0 for full size images "
+                             "(default: $ROSTERSCRAPER_IMAGE_WIDTH or 300)")
+    parser.add_argument("--archive", default=os.environ.get("ROSTERSCRAPER_ARCHIVE"),
+                        help="folder every roster and bio page fetched is recorded to as WARC files")
+    parser.add_argument("--archive-compression", choices=list(ARCHIVE_COMPRESSIONS), default="gzip",
+                        help="compression of new archive files, zstd using the dictionaries trained for the archive")
+    parser.add_argument("--replay", action="store_true", help="read pages from the archive instead of fetching them")
+    parser.add_argument("--as-of", default=None, metavar="TIMESTAMP",
+                        help="replay the captures at or before TIMESTAMP, such as 2024 or 20240815 (default: the latest)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    captures = commands.add_parser("captures", help="list the captures of a URL in the archive")
+    captures.add_argument("url")
+
+    train = commands.add_parser("train-dictionaries", help="train a zstd dictionary per platform from the pages in the archive")
+    train.add_argument("--size", type=int, default=ZSTD_DICTIONARY_SIZE, help="dictionary size in bytes")
+    train.add_argument("--samples", type=int, default=1000, help="most pages of a platform to train on")
+
+    benchmark = commands.add_parser("benchmark-microdata", help="time the microdata extractor against the soup extraction")
+    benchmark.add_argument("html_file", help="saved roster page of a team_hashmap site")
+    benchmark.add_argument("netloc", help="netloc of the site the page was saved from")
+    benchmark.add_argument("--repeat", type=int, default=20)
+
+    benchmark_normalizing = commands.add_parser("benchmark-normalize", help="time the column normalization against normalizing athlete by athlete")
+    benchmark_normalizing.add_argument("--athletes", type=int, nargs="+", default=[25, 100, 500, 2000, 10000],
+                                       help="roster sizes to time")
+    benchmark_normalizing.add_argument("--repeat", type=int, default=5)
+
+    benchmark_sidearm = commands.add_parser("benchmark-sidearm-json", help="time parsing Sidearm roster JSON against parsing the same athletes from html")
+    benchmark_sidearm.add_argument("--athletes", type=int, default=100)
+    benchmark_sidearm.add_argument("--repeat", type=int, default=20)
+
+    benchmark_parser = commands.add_parser("benchmark-parsers", help="time a batch of made up rosters from a local server with more and more parser processes")
+    benchmark_parser.add_argument("--rosters", type=int, default=500)
+    benchmark_parser.add_argument("--parsers", type=int, nargs="+", default=None, help="parser process counts to time (default: powers of two up to the core count)")
+    benchmark_parser.add_argument("--athletes", type=int, default=100, help="athletes on each roster")
+
+    benchmark_backend = commands.add_parser("benchmark-backends", help="time building and saving a combined dataset with each DataFrame backend")
+    benchmark_backend.add_argument("--rosters", type=int, default=500)
+    benchmark_backend.add_argument("--repeat", type=int, default=3)
+
+    memory = commands.add_parser("memory-report", help="report the bytes per row of a combined dataset with and without categories")
+    memory.add_argument("--athletes", type=int, default=100000)
+
+    server = commands.add_parser("serve", help="serve rosters as CSV over HTTP, hot reloading the site definitions")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8000)
+    server.add_argument("--sites", default=SITES_PATH, help="site definitions file (JSON or YAML)")
+
+    batch = commands.add_parser("batch", help="scrape every team roster URL in a file into a folder of CSV files")
+    batch.add_argument("url_file", help="text file with one team roster URL per line")
+    batch.add_argument("os_path", help="folder the CSV files are saved to")
+    batch.add_argument("--format", choices=["csv", "jsonl", "parquet", "sqlite"], default="csv")
+    batch.add_argument("--compression", choices=list(COMPRESSIONS), default=None, help="compress CSV and JSON Lines files")
+    batch.add_argument("--level", type=int, default=None,
+                       help="compression level (default: 6 for gzip, 3 for zstd)")
+    batch.add_argument("--journal", default=None, help="checkpoint journal used to resume the batch (default: in os_path)")
+    batch.add_argument("--fresh", action="store_true", help="start over instead of resuming from the journal")
+    batch.add_argument("--partitioned", action="store_true",
+                       help="lay the files out in school=/sport=/season= folders with a manifest")
+    batch.add_argument("--backend", choices=list(DATAFRAME_BACKENDS), default=DATAFRAME_BACKEND,
+                       help="DataFrame library Parquet files are built with (default: $ROSTERSCRAPER_BACKEND or pandas)")
+    add_pipeline_arguments(batch)
+
+    seasons = commands.add_parser("seasons", help="scrape a team's roster for a range of seasons into one dataset")
+    seasons.add_argument("team_url", help="team roster URL, of any season")
+    seasons.add_argument("os_path", help="folder the dataset is saved to")
+    seasons.add_argument("--from", dest="first_season", type=int, default=2010, help="first season (default: 2010)")
+    seasons.add_argument("--to", dest="last_season", type=int, default=None, help="last season (default: this year)")
+    seasons.add_argument("--format", choices=["csv", "parquet", "sqlite"], default="csv")
+    seasons.add_argument("--backend", choices=list(DATAFRAME_BACKENDS), default=DATAFRAME_BACKEND,
+                        help="DataFrame library the dataset is built with (default: $ROSTERSCRAPER_BACKEND or pandas)")
+    add_pipeline_arguments(seasons)
+
+    school = commands.add_parser("school", help="discover and scrape every team roster of a school into one dataset")
+    school.add_argument("domain", help="the school's athletics site, such as gamecocksonline.com")
+    school.add_argument("os_path", help="folder the dataset is saved to")
+    school.add_argument("--refresh", action="store_true", help="rediscover the rosters instead of using the cached list")
+    school.add_argument("--format", choices=["csv", "parquet", "sqlite"], default="csv")
+    school.add_argument("--backend", choices=list(DATAFRAME_BACKENDS), default=DATAFRAME_BACKEND,
+                        help="DataFrame library the dataset is built with (default: $ROSTERSCRAPER_BACKEND or pandas)")
+    add_pipeline_arguments(school)
+
+    conference = commands.add_parser("conference", help="scrape a sport's roster at every school of a conference into one dataset")
+    conference.add_argument("conference", help="conference name, such as SEC or \"Big Ten\"")
+    conference.add_argument("sport", help="sport, such as football or womens-basketball")
+    conference.add_argument("os_path", help="folder the dataset is saved to")
+    conference.add_argument("--directory", default=DIRECTORY_PATH, help="conference directory file")
+    conference.add_argument("--format", choices=["csv", "parquet", "sqlite"], default="csv")
+    conference.add_argument("--backend", choices=list(DATAFRAME_BACKENDS), default=DATAFRAME_BACKEND,
+                        help="DataFrame library the dataset is built with (default: $ROSTERSCRAPER_BACKEND or pandas)")
+    add_pipeline_arguments(conference)
+
+    track = commands.add_parser("track", help="snapshot every team roster URL in a file and report what changed since the last run")
+    track.add_argument("url_file", help="text file with one team roster URL per line")
+    track.add_argument("--snapshots", default=SNAPSHOT_DIR, help="snapshot store folder")
+    add_pipeline_arguments(track)
+
+    changes = commands.add_parser("changes", help="compare two snapshots of a team's roster")
+    changes.add_argument("team_url", help="team roster URL")
+    changes.add_argument("--from", dest="old_timestamp", default=None, help="older snapshot (default: the one before --to)")
+    changes.add_argument("--to", dest="new_timestamp", default=None, help="newer snapshot (default: the latest)")
+    changes.add_argument("--snapshots", default=SNAPSHOT_DIR, help="snapshot store folder")
+
+    thumbnails = commands.add_parser("thumbnails", help="download a roster's athlete photos and make uniform thumbnails of them")
+    thumbnails.add_argument("source", help="team roster URL, or a roster dataset saved as CSV or Parquet")
+    thumbnails.add_argument("os_path", help="folder the thumbnails and the roster are saved to")
+    thumbnails.add_argument("--images", default=None, help="image store folder (default: images in os_path)")
+    thumbnails.add_argument("--width", type=int, default=THUMBNAIL_SIZE[0])
+    thumbnails.add_argument("--height", type=int, default=THUMBNAIL_SIZE[1])
+    thumbnails.add_argument("--format", choices=list(THUMBNAIL_FORMATS), default="webp")
+    thumbnails.add_argument("--quality", type=int, default=80, help="encoder quality, 1 to 100")
+    thumbnails.add_argument("--workers", type=int, default=None, help="number of processes (default: one per core)")
+
+    args = parser.parse_args(args)
+    if args.replay and not args.archive:
+        parser.error("--replay needs an --archive")
+    if args.image_width < 0:
+        parser.error("--image-width can't be negative")
+    IMAGE_WIDTH = args.image_width
+    if args.command in ("captures", "train-dictionaries") and not args.archive:
+        parser.error(f"{args.command} needs an --archive")
+    options = {}
+    try:
+        if "fetchers" in args:
+            options = pipeline_options(args)
+        if args.archive and args.command not in ("captures", "train-dictionaries"):
+            use_archive(args.archive, args.replay, args.as_of, compression=args.archive_compression)
+        if args.command == "captures":
+            show_captures(args.archive, clean_url(args.url))
+        elif args.command == "train-dictionaries":
+            train_dictionaries(args.archive, args.size, args.samples)
+        elif args.command == "thumbnails":
+            source = clean_url(args.source) if is_absolute(args.source) else args.source
+            save_thumbnails(source, args.os_path, args.images, (args.width, args.height), args.format, args.quality,
+                            args.workers)
+        elif args.command == "track":
+            track_rosters(args.url_file, args.snapshots, **options)
+        elif args.command == "changes":
+            show_roster_changes(clean_url(args.team_url), args.old_timestamp, args.new_timestamp, args.snapshots)
+        elif args.command == "conference":
+            save_conference(args.conference, args.sport, args.os_path, args.format, args.directory,
+                            backend=args.backend, **options)
+        elif args.command == "school":
+            save_school(args.domain, args.os_path, args.format, args.refresh, backend=args.backend,
+                        **options)
+        elif args.command == "seasons":
+            save_season_range(clean_url(args.team_url), args.os_path, args.first_season, args.last_season,
+                              args.format, backend=args.backend, **options)
+        elif args.command == "batch":
+            save_batch(args.url_file, args.os_path, args.format, args.journal, args.fresh, args.partitioned,
+                       args.compression, args.level, args.backend, **options)
+        elif args.command == "benchmark-microdata":
+            benchmark_microdata(args.html_file, args.netloc, args.repeat)
+        elif args.command == "benchmark-normalize":
+            benchmark_normalize(args.athletes, args.repeat)
+        elif args.command == "benchmark-sidearm-json":
+            benchmark_sidearm_json(args.athletes, args.repeat)
+        elif args.command == "benchmark-parsers":
+            benchmark_parsers(args.rosters, args.parsers, args.athletes)
+        elif args.command == "benchmark-backends":
+            benchmark_backends(args.rosters, args.repeat)
+        elif args.command == "memory-report":
+            memory_report(args.athletes)
+        elif args.command == "serve":
+            load_site_definitions(args.sites)
+            serve(args.host, args.port)
+    except RosterScraperError as error:
+        parser.exit(1, f"{error}\n")
+    finally:
+        if options.get("images"):
+            options["images"].close()
+        shutdown_parser_pool()
+#------------------ #
+
 if __name__ == "__main__":
-    main_window()
\ No newline at end of file
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1:
+        command_line(sys.argv[1:])
+    else:
+        #The window records to (or with ROSTERSCRAPER_REPLAY set, replays from) the archive set in the environment
+        if os.environ.get("ROSTERSCRAPER_ARCHIVE"):
+            use_archive(os.environ["ROSTERSCRAPER_ARCHIVE"], "ROSTERSCRAPER_REPLAY" in os.environ,
+                        os.environ.get("ROSTERSCRAPER_REPLAY"),
+                        compression=os.environ.get("ROSTERSCRAPER_ARCHIVE_COMPRESSION", "gzip"))
+        main_window()
\ No newline at end of file
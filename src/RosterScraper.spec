@@ -8,7 +8,7 @@ a = Analysis(
     ['RosterScraper.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('sites.json', '.'), ('conferences.json', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+#The tests import the RosterScraper module straight from src
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
@@ -0,0 +1,60 @@
+import pytest
+import requests
+
+import RosterScraper as rs
+
+
+def response(url, body):
+    r = requests.Response()
+    r.url = url
+    r.status_code = 200
+    r.reason = "OK"
+    r.headers = requests.structures.CaseInsensitiveDict({"Content-Type": "text/html; charset=utf-8"})
+    r._content = body
+    return r
+
+
+def sidearm_page(i):
+    players = "".join(f'<li class="sidearm-roster-player">Player {i} {n}</li>' for n in range(50))
+    return f'<html><head><script src="/sidearm/common.js"></script></head><body><ul>{players}</ul></body></html>'.encode()
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_read_response_limit(tmp_path, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    archive = rs.WarcArchive(tmp_path, compression=compression)
+    archive.record(response("https://gosidearm.com/sports/football/roster", sidearm_page(0) * 100))
+    entry = archive.captures("https://gosidearm.com/sports/football/roster")[0]
+    status, _, headers, body = archive.read_response(entry)
+    assert status == 200 and body == sidearm_page(0) * 100
+    _, _, limited_headers, head = archive.read_response(entry, 4096)
+    assert limited_headers == headers
+    assert body.startswith(head) and len(head) < 4096
+
+
+def test_train_dictionaries_samples_per_platform(tmp_path, capsys, monkeypatch):
+    pytest.importorskip("zstandard")
+    archive = rs.WarcArchive(tmp_path)
+    for i in range(30):
+        archive.record(response(f"https://gosidearm.com/sports/sport{i}/roster", sidearm_page(i)))
+    for i in range(4):
+        archive.record(response(f"https://example.com/team{i}/roster",
+                                f'<div itemprop="athlete">Athlete {i}</div>'.encode() * 40))
+
+    read = []
+    read_response = rs.WarcArchive.read_response
+
+    def counting_read_response(self, entry, limit=None):
+        read.append(limit)
+        return read_response(self, entry, limit)
+
+    monkeypatch.setattr(rs.WarcArchive, "read_response", counting_read_response)
+    rs.train_dictionaries(tmp_path, size=4096, samples=20)
+
+    #Every page is fingerprinted from its head, only the sampled ones are read in full
+    assert read.count(None) == 20 + 4
+    assert len(read) == 34 + 20 + 4
+    output = capsys.readouterr().out
+    assert "sidearm: trained on 16 pages, 4 pages held out" in output
+    assert "microdata" in output and "held out" not in output.split("microdata")[1]
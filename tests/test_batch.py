@@ -0,0 +1,92 @@
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+import RosterScraper as rs
+
+PAGE = (Path(__file__).parent / "fixtures" / "sidearm-static.html").read_text()
+URLS = [f"https://gosidearm.com/sports/{sport}/roster/2023" for sport in ("football", "baseball", "softball")]
+PIPELINE = {"parsers": 1, "report_every": 60}
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    fetched = []
+    failing = set()
+
+    def fetch_roster(url, stream=True):
+        fetched.append(url)
+        if url in failing:
+            raise rs.RosterScraperError("Connection reset")
+        return "gosidearm.com", rs.SIDEARM_STATIC, PAGE, {}
+
+    monkeypatch.setattr(rs, "fetch_roster", fetch_roster)
+    yield fetched, failing
+    rs.shutdown_parser_pool()
+
+
+def url_file(tmp_path):
+    path = tmp_path / "urls.txt"
+    path.write_text("\n".join(URLS))
+    return path
+
+
+def test_interrupted_batch_resumes(tmp_path, fetched, capsys):
+    fetched, failing = fetched
+    failing.add(URLS[1])
+    rs.save_batch(url_file(tmp_path), tmp_path, "csv", **PIPELINE)
+    assert "Saved 2 of 3 rosters" in capsys.readouterr().out
+
+    #A crash while the journal was being written leaves half a line behind
+    with open(tmp_path / ".rosterscraper-journal.jsonl", "a") as f:
+        f.write('{"url": "https://gosidearm.com/sp')
+    fetched.clear()
+    failing.clear()
+    rs.save_batch(url_file(tmp_path), tmp_path, "csv", **PIPELINE)
+    assert fetched == [URLS[1]]
+    assert f"Saved 1 of 3 rosters to {tmp_path}, 2 already saved by an earlier run, 0 failed" in capsys.readouterr().out
+    assert len(list(tmp_path.glob("*.csv"))) == 3
+    journal = rs.BatchJournal(tmp_path / ".rosterscraper-journal.jsonl")
+    journal.close()
+    assert all(journal.is_complete(url) for url in URLS)
+
+    fetched.clear()
+    rs.save_batch(url_file(tmp_path), tmp_path, "csv", fresh=True, **PIPELINE)
+    assert sorted(fetched) == sorted(URLS)
+
+
+def test_partitioned_manifest_round_trip(tmp_path, fetched):
+    (tmp_path / "dataset").mkdir()
+    rs.save_batch(url_file(tmp_path), tmp_path / "dataset", "jsonl", partitioned=True, **PIPELINE)
+    manifest = json.loads((tmp_path / "dataset" / rs.MANIFEST_FILE_NAME).read_text())
+    assert manifest["format"] == "jsonl" and manifest["partitioning"] == list(rs.PARTITION_COLUMNS)
+    assert sorted(entry["url"] for entry in manifest["files"]) == sorted(URLS)
+
+    rows = rs.extract_roster("gosidearm.com", rs.SIDEARM_STATIC, PAGE)
+    for entry in manifest["files"]:
+        path = tmp_path / "dataset" / entry["path"]
+        assert path.parent.relative_to(tmp_path / "dataset").as_posix() == \
+            f"school=gosidearm.com/sport={entry['sport']}/season=2023"
+        assert rs.file_hash(path) == entry["sha256"] and entry["athletes"] == len(rows)
+        assert [tuple(json.loads(line).values()) for line in path.read_text().splitlines()] == rows
+
+
+@pytest.mark.parametrize("file_format", rs.TEXT_FORMATS)
+@pytest.mark.parametrize("compression", list(rs.COMPRESSIONS))
+def test_compressed_rows_round_trip(tmp_path, file_format, compression):
+    if compression == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+    _, rosters = rs.synthetic_rosters(1)
+    rows = next(iter(rosters.values()))
+    plain = tmp_path / f"roster.{file_format}"
+    compressed = tmp_path / f"roster{rs.output_suffix(file_format, compression)}"
+    rs.save_rows(plain, rows, file_format)
+    rs.save_rows(compressed, rows, file_format, compression)
+    if compression == "gzip":
+        content = gzip.decompress(compressed.read_bytes())
+    else:
+        content = zstandard.ZstdDecompressor().stream_reader(compressed.read_bytes()).read()
+    assert content == plain.read_bytes()
+    assert rs.text_output_format(compressed.name) == (file_format, compression)
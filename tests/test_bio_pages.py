@@ -0,0 +1,85 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import RosterScraper as rs
+
+ATHLETES = ["John Smith", "Amy Lee", "Kate Ng"]
+
+
+class Handler(BaseHTTPRequestHandler):
+    requested = []
+
+    def do_GET(self):
+        Handler.requested.append(self.path)
+        port = self.server.server_address[1]
+        if self.path == "/roster":
+            rows = "".join(f'<tr><td><a href="http://127.0.0.1:{port}/bio/{i}">{name}</a></td>'
+                           f'<td class="position">QB</td></tr>' for i, name in enumerate(ATHLETES))
+            body = f"<html><body><table>{rows}</table></body></html>"
+        else:
+            i = self.path.rsplit("/", 1)[1]
+            body = f'<html><body><section class="player-bio"><img src="/img/{i}-300x400.jpg"></section></body></html>'
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    definitions = tmp_path / "sites.json"
+    definitions.write_text(json.dumps({"127.0.0.1": {
+        "roster": ["table"], "athlete": ["tr"],
+        "fields": {"name": {"css": "a", "attr": "text"}, "Position": {"css": "td.position"},
+                   "image": {"follow": "a[href]", "page": ["section"], "css": "section img", "attr": "src"}}}}))
+    rs.load_site_definitions(definitions)
+    Handler.requested = []
+    yield f"http://127.0.0.1:{server.server_address[1]}/roster"
+    server.shutdown()
+    rs.shutdown_parser_pool()
+    rs.load_site_definitions(rs.SITES_PATH)
+
+
+def test_bio_pages_are_fetched_with_the_roster(site, monkeypatch):
+    netloc, platform, text, pages = rs.fetch_roster(site)
+    assert platform == rs.WMT
+    assert sorted(pages) == [site.replace("/roster", f"/bio/{i}") for i in range(len(ATHLETES))]
+    assert sorted(Handler.requested) == ["/bio/0", "/bio/1", "/bio/2", "/roster"]
+
+    #Parsing reads the fetched bio pages without any request
+    def no_requests(url, stream=False):
+        raise AssertionError(f"{url} fetched while parsing")
+
+    monkeypatch.setattr(rs, "get_page", no_requests)
+    df = rs.parse_roster(netloc, platform, text, pages)
+    assert list(df["First Name"]) == ["John", "Amy", "Kate"]
+    assert list(df["Position"]) == ["QB"] * 3
+    assert list(df["Original Image URL"]) == [f"127.0.0.1/img/{i}.jpg" for i in range(len(ATHLETES))]
+
+
+def test_pipeline_parsers_make_no_requests(site):
+    saved = {}
+    failures = rs.RosterPipeline(lambda url, rows: saved.update({url: rows}), parsers=1, report_every=60).run([site])
+    assert failures == []
+    assert [row[0] for row in saved[site]] == ["John", "Amy", "Kate"]
+    assert len(Handler.requested) == 1 + len(ATHLETES)
+
+
+def test_parser_pool_follows_reloaded_definitions(site, tmp_path):
+    page = rs.fetch_roster(site)
+    position = rs.COLUMNS.index("Position")
+    assert [row[position] for row in rs.get_parser_pool(1).submit(rs.parse_roster_rows, page).result()] == ["QB"] * 3
+
+    definitions = json.loads((tmp_path / "sites.json").read_text())
+    definitions["127.0.0.1"]["fields"]["Position"] = {"css": "a", "attr": "text"}
+    (tmp_path / "sites.json").write_text(json.dumps(definitions))
+    rs.load_site_definitions(tmp_path / "sites.json")
+    assert [row[position] for row in rs.get_parser_pool(1).submit(rs.parse_roster_rows, page).result()] == ATHLETES
@@ -0,0 +1,45 @@
+import pytest
+
+import RosterScraper as rs
+
+DIRECTORY = {
+    "sports": {"football": "football", "mens-basketball": "mens-basketball"},
+    "conferences": {
+        "Big Ten": {
+            "Iowa": "hawkeyesports.com",
+            "Ohio State": {"domain": "ohiostatebuckeyes.com", "sports": {"football": "m-footbl"}},
+        },
+        "ACC": {
+            "Duke": "goduke.com",
+            "Notre Dame": {"domain": "und.com", "except": ["football"]},
+        },
+    },
+}
+
+
+def test_sport_override():
+    assert rs.conference_roster_urls("big ten", "football", DIRECTORY) == {
+        "https://hawkeyesports.com/sports/football/roster": {"Conference": "Big Ten", "School": "Iowa", "Sport": "football"},
+        "https://ohiostatebuckeyes.com/sports/m-footbl/roster":
+            {"Conference": "Big Ten", "School": "Ohio State", "Sport": "football"},
+    }
+    assert "https://ohiostatebuckeyes.com/sports/mens-basketball/roster" in rs.conference_roster_urls(
+        "Big Ten", "mens-basketball", DIRECTORY)
+
+
+def test_sport_exception():
+    assert list(rs.conference_roster_urls("ACC", "football", DIRECTORY)) == ["https://goduke.com/sports/football/roster"]
+    assert list(rs.conference_roster_urls("ACC", "mens-basketball", DIRECTORY)) == [
+        "https://goduke.com/sports/mens-basketball/roster", "https://und.com/sports/mens-basketball/roster"]
+
+
+def test_unknown_conference():
+    with pytest.raises(rs.RosterScraperError, match="Unknown conference"):
+        rs.conference_roster_urls("Pac-12", "football", DIRECTORY)
+
+
+def test_bundled_directory():
+    urls = rs.conference_roster_urls("Big Ten", "football")
+    assert len(urls) == 18
+    assert "https://ohiostatebuckeyes.com/sports/m-footbl/roster" in urls
+    assert [tags["School"] for tags in rs.conference_roster_urls("ACC", "football").values()].count("Notre Dame") == 0
@@ -0,0 +1,27 @@
+import RosterScraper as rs
+
+
+def row(first, last, position, image_path=None):
+    values = dict.fromkeys(rs.COLUMNS, "")
+    values.update({"First Name": first, "Last Name": last, "Position": position})
+    row = tuple(values[column] for column in rs.COLUMNS)
+    return row if image_path is None else (*row, image_path)
+
+
+def test_diff_rosters():
+    changes = rs.diff_rosters([row("John", "Smith", "QB"), row("Amy", "Lee", "WR")],
+                              [row("John", "Smith", "RB"), row("Kate", "Ng", "WR")])
+    assert changes["added"] == [row("Kate", "Ng", "WR")]
+    assert changes["removed"] == [row("Amy", "Lee", "WR")]
+    assert changes["changed"] == [(row("John", "Smith", "RB"), {"Position": ("QB", "RB")})]
+
+
+def test_diff_rosters_with_image_paths():
+    changes = rs.diff_rosters([row("John", "Smith", "QB", "images/ab/old.jpg")],
+                              [row("John", "Smith", "QB", "images/cd/new.jpg")])
+    assert changes["changed"][0][1] == {rs.IMAGE_PATH_COLUMN: ("images/ab/old.jpg", "images/cd/new.jpg")}
+
+
+def test_diff_rosters_against_snapshot_without_image_paths():
+    changes = rs.diff_rosters([row("John", "Smith", "QB")], [row("John", "Smith", "RB", "images/cd/new.jpg")])
+    assert changes["changed"][0][1] == {"Position": ("QB", "RB")}
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import RosterScraper as rs
+
+FIXTURE = (Path(__file__).parent / "fixtures" / "sidearm-static.html").read_text()
+
+
+def image_urls(netloc="gosidearm.com", platform=rs.SIDEARM_STATIC, text=FIXTURE):
+    df = rs.parse_roster(netloc, platform, text)
+    return list(df["Image URL"]), list(df["Original Image URL"])
+
+
+def test_image_width(monkeypatch):
+    assert image_urls()[0][0] == "gosidearm.com/images/2023/js.jpg?width=300&quality=80"
+    monkeypatch.setattr(rs, "IMAGE_WIDTH", 640)
+    assert image_urls()[0][0] == "gosidearm.com/images/2023/js.jpg?width=640&quality=80"
+
+
+def test_full_size_images(monkeypatch):
+    monkeypatch.setattr(rs, "IMAGE_WIDTH", 0)
+    sized, original = image_urls()
+    assert sized == original == ["gosidearm.com/images/2023/js.jpg", ""]
+
+
+def test_pattern_policy_width(monkeypatch):
+    images = rs.pd.Series(["cdn.example.com/photos/w_100/a.jpg"])
+    policy = {"pattern": r"/w_\d+/", "replace": "/w_{width}/"}
+    monkeypatch.setattr(rs, "IMAGE_WIDTH", 480)
+    assert list(rs.sized_image_urls(images, policy)) == ["cdn.example.com/photos/w_480/a.jpg"]
+
+
+def test_query_policy_keeps_the_image_query(monkeypatch):
+    images = rs.pd.Series(["cdn.example.com/a.jpg", "cdn.example.com/b.jpg?ver=2&w=1200", "cdn.example.com/c.jpg?"])
+    policy = {"query": {"w": "{width}", "quality": 80}}
+    monkeypatch.setattr(rs, "IMAGE_WIDTH", 480)
+    sized = ["cdn.example.com/a.jpg?w=480&quality=80", "cdn.example.com/b.jpg?ver=2&w=480&quality=80",
+             "cdn.example.com/c.jpg?w=480&quality=80"]
+    assert list(rs.sized_image_urls(images, policy)) == sized
+    assert [rs.sized_image_url(image_url, policy) for image_url in images] == sized
+
+
+def test_site_policy_from_definition():
+    html = ('<div class="container roster__wrapper"><li itemprop="athlete">'
+            '<span itemprop="name" content="John Smith"></span>'
+            '<span itemprop="image" content="https://gamecocksonline.com/wp-content/uploads/js-300x400.jpg?ver=2"></span>'
+            '</li></div>')
+    sized, original = image_urls("gamecocksonline.com", rs.find_site_adapter("gamecocksonline.com").platform, html)
+    assert sized == original == ["https://gamecocksonline.com/wp-content/uploads/js.jpg?ver=2"]
+
+    adapter = rs.site_adapters["gamecocksonline.com"]
+    adapter.image_size = {"query": {"w": "{width}"}}
+    try:
+        sized, original = image_urls("gamecocksonline.com", adapter.platform, html)
+    finally:
+        adapter.image_size = None
+    assert original == ["https://gamecocksonline.com/wp-content/uploads/js.jpg?ver=2"]
+    assert sized == ["https://gamecocksonline.com/wp-content/uploads/js.jpg?ver=2&w=300"]
+
+
+def test_image_width_option():
+    width = rs.IMAGE_WIDTH
+    try:
+        rs.command_line(["--image-width", "200", "benchmark-normalize", "--athletes", "3", "--repeat", "1"])
+        assert rs.IMAGE_WIDTH == 200
+        assert rs.get_parser_pool(1) is not None and rs.parser_pool_key[2] == 200
+    finally:
+        rs.shutdown_parser_pool()
+        rs.IMAGE_WIDTH = width
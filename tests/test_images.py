@@ -0,0 +1,74 @@
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+import RosterScraper as rs
+
+
+def jpeg():
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGB", (30, 40), "red").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/ok.jpg":
+            self.send_error(404)
+            return
+        body = jpeg()
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def host():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def roster(host):
+    rows = [rs.athlete_row("", image_url) for image_url in (f"{host}/ok.jpg", f"{host}/missing.jpg", "")]
+    return rs.pd.DataFrame(rows, columns=rs.COLUMNS)
+
+
+def test_image_download_url_keeps_the_port():
+    assert rs.image_download_url("example.com:8080/a.jpg") == "https://example.com:8080/a.jpg"
+    assert rs.image_download_url("//example.com:8080/a.jpg") == "https://example.com:8080/a.jpg"
+    assert rs.image_download_url("http://example.com:8080/a.jpg") == "http://example.com:8080/a.jpg"
+    assert rs.image_download_url("example.com/a.jpg") == "https://example.com/a.jpg"
+
+
+def test_failed_downloads_are_logged_and_counted(host, tmp_path, capsys):
+    images = rs.ImageStore(tmp_path / "images")
+    try:
+        rows = images.add_image_paths(rs.roster_rows(roster(host)))
+        stage = rs.PipelineStage("images", None, 1, 1, details=lambda: f"{images.failed} images failed")
+        assert stage.report(1).endswith("0 failed, 1 images failed")
+    finally:
+        images.close()
+    assert [bool(row[-1]) for row in rows] == [True, False, False]
+    assert images.failed == 1
+    assert f"{host}/missing.jpg: 404" in capsys.readouterr().err
+
+
+def test_thumbnail_report_counts_failed_downloads(host, tmp_path, capsys):
+    images = rs.ImageStore(tmp_path / "images")
+    try:
+        df = rs.make_thumbnails(roster(host), tmp_path / "thumbnails", images, workers=1)
+    finally:
+        images.close()
+    assert [bool(path) for path in df["Thumbnail Path"]] == [True, False, False]
+    assert "Made 1 thumbnails, 0 already made, 0 failed, 1 photos failed to download" in capsys.readouterr().err
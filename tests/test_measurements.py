@@ -0,0 +1,37 @@
+import pytest
+
+import RosterScraper as rs
+
+
+def vectorized(height, weight, athlete_class):
+    row = rs.athlete_row("John Smith", "")
+    row.update({"Height": height, "Weight": weight, "Class": athlete_class})
+    return rs.roster_rows(rs.add_measurement_columns(rs.normalize_athletes([row], "example.com", rs.WMT)))[0][-4:]
+
+
+@pytest.mark.parametrize("measure", [rs.athlete_measurements, vectorized])
+@pytest.mark.parametrize("height, inches", [
+    ("6-2", 74.0), ("6'2\"", 74.0), ("6′2″", 74.0), ("6’ 11", 83.0), ("6 ft 2", 74.0), ("6-", 72.0),
+    ("188 cm", 74.0), ("1.88 m", 74.0), ("74″", 74.0), ("74 in.", 74.0), ("", None), ("tall", None),
+])
+def test_height(measure, height, inches):
+    assert measure(height, "", "")[0] == inches
+
+
+@pytest.mark.parametrize("measure", [rs.athlete_measurements, vectorized])
+@pytest.mark.parametrize("weight, pounds", [
+    ("215", 215.0), ("215 lbs", 215.0), ("~215 lbs.*", 215.0), ("215#", 215.0), ("95 kg", 209.4),
+    ("", None), ("n/a", None),
+])
+def test_weight(measure, weight, pounds):
+    assert measure("", weight, "")[1] == pounds
+
+
+@pytest.mark.parametrize("measure", [rs.athlete_measurements, vectorized])
+@pytest.mark.parametrize("athlete_class, year, redshirt", [
+    ("Fr.", 1, False), ("R-Fr.", 1, True), ("RS So.", 2, True), ("R-Jr.", 3, True), ("RSr.", 4, True),
+    ("Sr. (R)", 4, True), ("Redshirt Freshman", 1, True), ("Gr.", 5, False), ("5th", 5, False),
+    ("", None, None), ("??", None, None), ("Redshirt", None, None),
+])
+def test_class(measure, athlete_class, year, redshirt):
+    assert measure("", "", athlete_class)[2:] == (year, redshirt)
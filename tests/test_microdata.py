@@ -0,0 +1,40 @@
+import json
+
+import RosterScraper as rs
+
+NETLOC = "example.com"
+
+
+def item(name, image):
+    return (f'<li itemprop="athlete" itemscope><span itemprop="name">{name}</span>'
+            f'<img itemprop="image" src="{image}"></li>')
+
+
+def page(items, linked=()):
+    json_ld = json.dumps({"@type": "SportsTeam", "athlete": [{"name": name, "image": image} for name, image in linked]})
+    return (f'<html><head><script type="application/ld+json">{json_ld}</script></head>'
+            f'<body><main><ul>{"".join(items)}</ul></main><footer><a>Tickets</a></footer></body></html>')
+
+
+def names_and_images(text):
+    return [(row[rs.NAME], row["Image URL"]) for row in rs.extract_microdata(text, NETLOC)]
+
+
+def test_athletes_sharing_a_name_are_kept():
+    text = page([item("Chris Smith", "/images/cs1.jpg"), item("Chris Smith", "/images/cs2.jpg")])
+    assert names_and_images(text) == [("Chris Smith", "example.com/images/cs1.jpg"),
+                                      ("Chris Smith", "example.com/images/cs2.jpg")]
+
+
+def test_json_ld_copies_of_microdata_items_are_dropped():
+    text = page([item("Chris Smith", "/images/cs1.jpg"), item("Chris Smith", "/images/cs2.jpg")],
+                [("Chris Smith", "https://example.com/images/cs1.jpg"), ("Chris Smith", "https://example.com/images/cs2.jpg"),
+                 ("Amy Lee", "https://example.com/images/al.jpg")])
+    assert names_and_images(text) == [("Chris Smith", "example.com/images/cs1.jpg"),
+                                      ("Chris Smith", "example.com/images/cs2.jpg"),
+                                      ("Amy Lee", "https://example.com/images/al.jpg")]
+
+
+def test_json_ld_only_page():
+    text = page([], [("Chris Smith", ""), ("Chris Smith", "")])
+    assert names_and_images(text) == [("Chris Smith", ""), ("Chris Smith", "")]
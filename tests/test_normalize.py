@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+import RosterScraper as rs
+
+
+def vectorized(athletes, netloc, platform):
+    return rs.roster_rows(rs.add_measurement_columns(rs.normalize_athletes(athletes, netloc, platform)))
+
+
+@pytest.mark.parametrize("normalize", [rs.normalize_rows, vectorized])
+@pytest.mark.parametrize("name, first, last", [
+    ("Cher", "Cher", ""),
+    ("  Cher ", "Cher", ""),
+    ("Cher\xa0", "Cher", ""),
+    ("Jean\xa0Luc Picard", "Jean", "Luc Picard"),
+    ("John   Smith", "John", "Smith"),
+])
+def test_name_split(normalize, name, first, last):
+    row = normalize([rs.athlete_row(name, "")], "example.com", rs.WMT)[0]
+    assert row[:3] == (first, last, f"{first.replace(' ', '')}+{last.replace(' ', '')}@example.com")
+
+
+def test_paths_agree():
+    rng = random.Random(0)
+    athletes = []
+    for i in range(500):
+        row = rs.athlete_row(rng.choice(["Cher", "John  Smith", "Jean\xa0Picard", "", "A B C"]),
+                             rng.choice(["/img/a.jpg?w=1", "https://x.com/a-300x400.jpg", ""]))
+        row["Height"] = rng.choice(["6-2", "6'2\"", "185 cm", "1.85 m", "74", "", "tall"])
+        row["Weight"] = rng.choice(["215", "95 kg", "", "n/a", "180.5 lbs"])
+        row["Class"] = rng.choice(["R-Jr.", "RS So.", "Sr. (R)", "Gr.", "", "??", "Freshman"])
+        row[rs.HOMETOWN] = rng.choice(["Austin, Texas", "Reno", "", "A, B, C"])
+        athletes.append(row)
+    for platform in (rs.SIDEARM_STATIC, rs.WMT):
+        assert rs.normalize_rows(athletes, "x.com", platform) == vectorized(athletes, "x.com", platform)
+
+
+def test_large_rosters_are_vectorized(monkeypatch):
+    athletes = [rs.athlete_row(f"First{i} Last{i}", "") for i in range(3)]
+    monkeypatch.setattr(rs, "normalize_rows", lambda *args: pytest.fail("normalized athlete by athlete"))
+    monkeypatch.setattr(rs, "VECTORIZED_NORMALIZE_ATHLETES", 3)
+    assert [row[:2] for row in rs.normalize_roster(athletes, "x.com", rs.WMT)] == [
+        ("First0", "Last0"), ("First1", "Last1"), ("First2", "Last2")]
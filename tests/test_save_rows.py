@@ -0,0 +1,16 @@
+import pytest
+
+import RosterScraper as rs
+
+
+@pytest.mark.parametrize("backend", list(rs.DATAFRAME_BACKENDS))
+def test_parquet_rows_through_backend(tmp_path, backend):
+    pyarrow = pytest.importorskip("pyarrow")
+    if backend == "polars":
+        pytest.importorskip("polars")
+    _, rosters = rs.synthetic_rosters(1)
+    rows = next(iter(rosters.values()))
+    rs.save_rows(tmp_path / "roster.parquet", rows, "parquet", backend=backend)
+    table = pyarrow.parquet.read_table(tmp_path / "roster.parquet")
+    assert table.column_names == rs.COLUMNS
+    assert [tuple(row.values()) for row in table.to_pylist()] == rows
@@ -0,0 +1,27 @@
+import pytest
+
+import RosterScraper as rs
+
+
+def test_season_urls():
+    assert rs.season_urls("gamecocksonline.com/sports/football/roster/2022", 2020, 2021) == {
+        "2020": "gamecocksonline.com/sports/football/roster/2020",
+        "2021": "gamecocksonline.com/sports/football/roster/2021"}
+    assert rs.season_urls("gosidearm.com/sports/mens-basketball/roster/season/2022-23", 2021, 2022) == {
+        "2021-22": "gosidearm.com/sports/mens-basketball/roster/season/2021-22",
+        "2022-23": "gosidearm.com/sports/mens-basketball/roster/season/2022-23"}
+
+
+@pytest.mark.parametrize("url", ["gosidearm.com/sports/football", "gosidearm.com/sports/football/rosters"])
+def test_urls_without_roster(url):
+    with pytest.raises(rs.RosterScraperError):
+        rs.roster_root(url)
+    with pytest.raises(rs.RosterScraperError):
+        rs.season_urls(url, 2020, 2021)
+
+
+def test_seasons_command_reports_bad_urls(capsys):
+    with pytest.raises(SystemExit) as exit:
+        rs.command_line(["seasons", "https://gosidearm.com/sports/football", "."])
+    assert exit.value.code == 1
+    assert "no /roster" in capsys.readouterr().err
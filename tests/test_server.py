@@ -0,0 +1,31 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+
+import RosterScraper as rs
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), rs.RosterRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("query", ["", "?url=", "?other=1", "?url=not%20a%20url", "?url=gosidearm.com/sports/football/roster"])
+def test_missing_or_invalid_url_is_a_bad_request(server, query):
+    assert requests.get(f"{server}/roster{query}").status_code == 400
+
+
+def test_failed_upstream_request_is_a_bad_gateway(server):
+    #Nothing listens on port 1
+    r = requests.get(f"{server}/roster", params={"url": "http://127.0.0.1:1/sports/football/roster"})
+    assert r.status_code == 502
+
+
+def test_unknown_path(server):
+    assert requests.get(f"{server}/rosters").status_code == 404
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import RosterScraper as rs
+
+FIXTURES = Path(__file__).parent / "fixtures"
+NETLOC = "gosidearm.com"
+
+
+def fixture(name):
+    return (FIXTURES / name).read_text()
+
+
+def test_unflatten_nuxt_data_follows_indexes():
+    values = [{"data": 1, "again": 1, "tags": 4, "lookup": 6}, ["Reactive", 2], {"name": 3}, "Smith",
+              ["Set", 3, 5], "QB", ["Map", 3, 5]]
+    data = rs.unflatten_nuxt_data(values)
+    assert data["data"] == {"name": "Smith"}
+    assert data["again"] is data["data"]
+    assert data["tags"] == ["Smith", "QB"]
+    assert data["lookup"] == ["Smith", "QB"]
+
+
+def test_unflatten_nuxt_data_ignores_bad_indexes():
+    assert rs.unflatten_nuxt_data([{"missing": 7, "text": "x"}, "unused"]) == {"missing": None, "text": None}
+    assert rs.unflatten_nuxt_data([["Unknown", 1], 2]) is None
+
+
+def test_extract_sidearm_json_nuxt_data():
+    athletes = rs.extract_sidearm_json(fixture("sidearm-nuxt-data.html"), NETLOC)
+    assert athletes == [
+        {'First Name': 'John', 'Last Name': 'Smith', 'Hometown': 'Dallas, Texas', 'Class': 'R-Jr.',
+         'High School': 'Jesuit', 'Position': 'QB', 'Jersey Number': '12', 'Weight': '215', 'Height': '6-2',
+         'Image URL': '/images/2023/js.jpg?width=80'},
+        {'First Name': 'Amy', 'Last Name': 'Lee', 'Hometown': 'Reno, Nev.', 'Class': '', 'High School': '',
+         'Position': 'WR', 'Jersey Number': '3', 'Weight': '', 'Height': '', 'Image URL': ''},
+    ]
+
+
+def test_extract_sidearm_json_embedded_roster():
+    athletes = rs.extract_sidearm_json(fixture("sidearm-roster-json.html"), NETLOC)
+    assert athletes == [
+        {'First Name': 'Maria', 'Last Name': 'de la Cruz', 'Hometown': 'Austin, Texas', 'Class': 'So.',
+         'High School': 'Lakeview', 'Position': 'Setter', 'Jersey Number': '7', 'Weight': '', 'Height': '5-10',
+         'Image URL': '/images/2024/mdlc.jpg?width=120'},
+        {'First Name': 'Kate', 'Last Name': 'Ng', 'Hometown': 'Toronto, Ontario', 'Class': '', 'High School': '',
+         'Position': 'Libero', 'Jersey Number': '14', 'Weight': '', 'Height': '', 'Image URL': ''},
+    ]
+
+
+def test_dynamic_pages_have_no_roster_lists():
+    assert rs.extract_sidearm_athletes(fixture("sidearm-nuxt-data.html"), NETLOC) is None
+    assert rs.extract_sidearm_athletes(fixture("sidearm-roster-json.html"), NETLOC) is None
+
+
+def test_parse_roster_json_columns():
+    rows = rs.roster_rows(rs.parse_roster(NETLOC, rs.SIDEARM_DYNAMIC, fixture("sidearm-roster-json.html")))
+    assert rows == [
+        ('Maria', 'de la Cruz', 'Maria+delaCruz@example.com', 'gosidearm.com/images/2024/mdlc.jpg?width=300&quality=80',
+         'Austin', ' Texas', 'So.', 'Lakeview', 'Setter', '7', '5-10', '', 'gosidearm.com/images/2024/mdlc.jpg',
+         70.0, None, 2, False),
+        ('Kate', 'Ng', 'Kate+Ng@example.com', '', 'Toronto', ' Ontario', '', '', 'Libero', '14', '', '', '',
+         None, None, None, None),
+    ]
+
+
+def test_nuxt_data_matches_static_html():
+    dynamic = rs.parse_roster(NETLOC, rs.SIDEARM_DYNAMIC, fixture("sidearm-nuxt-data.html"))
+    static = rs.parse_roster(NETLOC, rs.SIDEARM_STATIC, fixture("sidearm-static.html"))
+    assert list(dynamic.columns) == list(static.columns)
+    assert rs.roster_rows(dynamic) == rs.roster_rows(static)
+    assert rs.roster_rows(dynamic)[0] == (
+        'John', 'Smith', 'John+Smith@example.com', 'gosidearm.com/images/2023/js.jpg?width=300&quality=80',
+        'Dallas', ' Texas', 'R-Jr.', 'Jesuit', 'QB', '12', '6-2', '215', 'gosidearm.com/images/2023/js.jpg',
+        74.0, 215.0, 3, True)
+
+
+def test_benchmark_sidearm_json_times_both_paths():
+    timings = rs.benchmark_sidearm_json(count=5, repeat=1)
+    assert set(timings) == {"html", "json"}
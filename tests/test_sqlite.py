@@ -0,0 +1,63 @@
+import sqlite3
+
+import RosterScraper as rs
+
+URL = "https://gosidearm.com/sports/football/roster"
+
+
+def row(first, last, jersey):
+    values = dict.fromkeys(rs.COLUMNS, "")
+    values.update({"First Name": first, "Last Name": last, "Jersey Number": jersey})
+    return tuple(values[column] for column in rs.COLUMNS)
+
+
+def stored(path):
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT first_name, last_name, name_ordinal, jersey_number FROM athletes "
+                                  "ORDER BY first_name, last_name, name_ordinal").fetchall()
+
+
+def test_athletes_sharing_a_name_are_kept(tmp_path):
+    sink = rs.SQLiteSink(tmp_path / "rosters.db")
+    sink(URL, [row("John", "Smith", "12"), row("John", "Smith", "40"), row("", "", "7"), row("", "", "8")])
+    sink.close()
+    assert sink.athletes == 4
+    assert stored(tmp_path / "rosters.db") == [("", "", 1, "7"), ("", "", 2, "8"),
+                                               ("John", "Smith", 1, "12"), ("John", "Smith", 2, "40")]
+
+    #A later scrape updates the athletes in roster order
+    sink = rs.SQLiteSink(tmp_path / "rosters.db")
+    sink(URL, [row("John", "Smith", "12"), row("John", "Smith", "41")])
+    sink.close()
+    assert stored(tmp_path / "rosters.db")[2:] == [("John", "Smith", 1, "12"), ("John", "Smith", 2, "41")]
+
+
+def test_databases_keyed_by_name_are_rebuilt(tmp_path):
+    path = tmp_path / "rosters.db"
+    with sqlite3.connect(path) as connection:
+        connection.executescript("""
+        CREATE TABLE teams (id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE, school TEXT, sport TEXT, season TEXT,
+                            conference TEXT);
+        CREATE TABLE scrapes (id INTEGER PRIMARY KEY, team_id INTEGER NOT NULL REFERENCES teams (id),
+                              scraped_at TEXT NOT NULL, athletes INTEGER NOT NULL);
+        CREATE TABLE athletes (team_id INTEGER NOT NULL REFERENCES teams (id),
+                               scrape_id INTEGER NOT NULL REFERENCES scrapes (id),
+                               first_name TEXT, last_name TEXT, jersey_number TEXT,
+                               PRIMARY KEY (team_id, first_name, last_name));
+        CREATE INDEX athletes_name ON athletes (last_name, first_name);
+        INSERT INTO teams (id, url) VALUES (1, 'https://gosidearm.com/sports/football/roster');
+        INSERT INTO scrapes (id, team_id, scraped_at, athletes) VALUES (1, 1, '2024-01-01T00:00:00', 1);
+        INSERT INTO athletes VALUES (1, 1, 'John', 'Smith', '12');
+        """)
+    connection.close()
+
+    sink = rs.SQLiteSink(path)
+    sink(URL, [row("John", "Smith", "12"), row("John", "Smith", "40")])
+    sink.close()
+    assert stored(path) == [("John", "Smith", 1, "12"), ("John", "Smith", 2, "40")]
+    with sqlite3.connect(path) as connection:
+        tables = [name for name, in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        columns = [column[1] for column in connection.execute("PRAGMA table_info(athletes)")]
+    connection.close()
+    assert "athletes_unordered" not in tables
+    assert columns[2:] == ["name_ordinal"] + rs.SQLITE_COLUMNS
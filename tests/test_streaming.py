@@ -0,0 +1,78 @@
+import io
+from pathlib import Path
+
+import RosterScraper as rs
+
+PAGE = (Path(__file__).parent / "fixtures" / "sidearm-static.html").read_text()
+CHUNK = 64
+
+
+class Raw(io.BytesIO):
+    released = False
+
+    def read(self, size=-1, decode_content=True):
+        return super().read(size)
+
+    def release_conn(self):
+        self.released = True
+
+
+# A streamed response over body, read CHUNK bytes at a time
+class Response:
+    encoding = "utf-8"
+    closed = False
+
+    def __init__(self, body):
+        self.raw = Raw(body.encode())
+
+    def chunks(self):
+        while chunk := self.raw.read(CHUNK):
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def stream(body, container=rs.SIDEARM_ROSTER_CONTAINER, end_markers=rs.SIDEARM_ROSTER_END):
+    r = Response(body)
+    rest = r.chunks()
+    return r, rs.stream_roster_text(r, next(rest), rest, container, end_markers)
+
+
+def test_reading_stops_after_the_end_marker():
+    tail = "<footer>" + "<p>news</p>" * 10000 + "</footer>"
+    r, text = stream(PAGE.replace("</body>", tail + "</body>"))
+    end = text.index('<ul class="sidearm-roster-coaches">')
+    assert len(text) < end + 2 * CHUNK
+    assert list(rs.parse_roster("gosidearm.com", rs.SIDEARM_STATIC, text)["First Name"]) == ["John", "Amy"]
+    #Too much was left to drain, so the connection is closed
+    assert r.closed and not r.raw.released
+
+
+def test_a_short_rest_is_drained_back_to_the_pool():
+    page = PAGE.replace("</body>", "<footer>" + "<p>news</p>" * 50 + "</footer></body>")
+    r, text = stream(page)
+    assert len(text) < page.index("<footer>") + CHUNK
+    assert r.raw.released and not r.closed
+    assert r.raw.read() == b""
+
+
+def test_a_page_without_the_end_marker_is_read_in_full():
+    page = PAGE.replace('<ul class="sidearm-roster-coaches"><li>Coach X</li></ul>', "")
+    r, text = stream(page)
+    assert text == page
+    assert not r.closed and not r.raw.released
+
+
+def test_a_page_without_the_roster_container_is_read_in_full():
+    page = PAGE.replace("sidearm-roster-players", "sidearm-roster-grid")
+    r, text = stream(page)
+    assert text == page
+    assert not r.closed and not r.raw.released
+
+
+def test_a_single_container_ends_reading_when_it_closes():
+    page = PAGE + "<div>" * 100
+    r, text = stream(page, end_markers=None)
+    assert text.index("</ul>") < len(text) < text.index("</ul>") + 2 * CHUNK
+    assert r.raw.released